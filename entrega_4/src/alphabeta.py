@@ -0,0 +1,238 @@
+import time
+
+from book import OpeningBook
+from engine import Engine, SearchStats
+from evaluation import WIN_SCORE, Evaluator
+from game import MOVES, GameMatch, Movement
+from tablebase import LOSS, WIN, Tablebase
+from transposition import (
+    EXACT,
+    LOWER_BOUND,
+    NO_MOVE,
+    UPPER_BOUND,
+    TranspositionTable,
+)
+
+# intervalo de nós entre consultas ao relógio
+TIME_CHECK_INTERVAL = 1024
+# scores acima disso são vitórias forçadas, guardadas na tabela relativas ao nó
+MATE_THRESHOLD = WIN_SCORE - 1000
+
+
+def score_to_table(score: int, ply: int) -> int:
+    if score > MATE_THRESHOLD:
+        return score + ply
+    if score < -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_table(score: int, ply: int) -> int:
+    if score > MATE_THRESHOLD:
+        return score - ply
+    if score < -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+class AlphaBetaEngine(Engine):
+    __time_budget: float
+    __max_depth: int
+    __table: TranspositionTable | None
+    __tablebase: Tablebase | None
+    __evaluator: Evaluator
+
+    __nodes: int
+    __deadline: float
+    __stopped: bool
+
+    def __init__(
+        self,
+        time_budget: float = 1.0,
+        max_depth: int = 64,
+        table_size_mb: float = 16,
+        tablebase: Tablebase | None = None,
+        evaluator: Evaluator | None = None,
+        book: OpeningBook | None = None
+    ):
+        super().__init__(book)
+        self.__time_budget = time_budget
+        self.__max_depth = max_depth
+        self.__table = TranspositionTable(table_size_mb) if table_size_mb > 0 else None
+        self.__tablebase = tablebase
+        self.__evaluator = evaluator or Evaluator()
+
+        self.__nodes = 0
+        self.__deadline = 0.0
+        self.__stopped = False
+
+    def get_time_budget(self) -> float:
+        return self.__time_budget
+
+    def get_transposition_table(self) -> TranspositionTable | None:
+        return self.__table
+
+    def get_evaluator(self) -> Evaluator:
+        return self.__evaluator
+
+    def choose_move(self, match: GameMatch) -> Movement | None:
+        move = self.book_move(match)
+
+        if move is not None:
+            return move
+
+        start = time.perf_counter()
+
+        self.__nodes = 0
+        self.__deadline = start + self.__time_budget
+        self.__stopped = False
+
+        moves = list(match.legal_move_codes(match.get_current_player()))
+
+        if not moves:
+            return None
+
+        best_move = moves[0]
+        best_score = 0
+        completed_depth = 0
+
+        for depth in range(1, self.__max_depth + 1):
+            score, move = self.__search_root(match, moves, depth)
+
+            if self.__stopped:
+                break
+
+            best_score, best_move = score, move
+            completed_depth = depth
+
+            # a melhor jogada da iteração anterior é a primeira a ser testada
+            moves.remove(move)
+            moves.insert(0, move)
+
+            if abs(score) >= WIN_SCORE - self.__max_depth:
+                break
+
+        elapsed = time.perf_counter() - start
+        self.set_last_stats(SearchStats(self.__nodes, completed_depth, elapsed, best_score))
+
+        return MOVES[best_move]
+
+    def __search_root(self, match: GameMatch, moves: list[int], depth: int):
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        best_move = moves[0]
+
+        for move in moves:
+            match.make_code(move)
+            score = -self.__negamax(match, depth - 1, -beta, -alpha, 1)
+            match.unmake()
+
+            if self.__stopped:
+                break
+
+            if score > alpha:
+                alpha = score
+                best_move = move
+
+        return alpha, best_move
+
+    def __negamax(self, match: GameMatch, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.__nodes += 1
+
+        if self.__nodes % TIME_CHECK_INTERVAL == 0 and (
+            time.perf_counter() >= self.__deadline or self.is_stop_requested()
+        ):
+            self.__stopped = True
+            return 0
+
+        board = match.get_board()
+
+        # a linha foi fechada pelo adversário, que jogou por último
+        if board.winning_line() is not None:
+            return -WIN_SCORE + ply
+
+        if self.__tablebase is not None:
+            entry = self.__tablebase.probe_bits(board.get_bits())
+
+            if entry is not None:
+                value, distance = entry
+
+                if value == WIN:
+                    return WIN_SCORE - ply - distance
+                if value == LOSS:
+                    return -WIN_SCORE + ply + distance
+                return 0
+
+        if depth == 0:
+            return self.evaluate(match)
+
+        table = self.__table
+        key = match.get_hash()
+        hint = NO_MOVE
+        original_alpha = alpha
+
+        if table is not None:
+            entry = table.probe(key)
+
+            if entry is not None:
+                table_score, table_depth, flag, hint = entry
+
+                if table_depth >= depth:
+                    table_score = score_from_table(table_score, ply)
+
+                    if flag == EXACT:
+                        return table_score
+                    if flag == LOWER_BOUND:
+                        alpha = max(alpha, table_score)
+                    elif flag == UPPER_BOUND:
+                        beta = min(beta, table_score)
+
+                    if alpha >= beta:
+                        return table_score
+
+        moves = list(match.legal_move_codes(match.get_current_player()))
+
+        if not moves:
+            # sem movimentos possíveis: considerado empate
+            return 0
+
+        # o código guardado na tabela é testado primeiro
+        if hint != NO_MOVE and hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+
+        best = -WIN_SCORE - 1
+        best_move = moves[0]
+
+        for move in moves:
+            match.make_code(move)
+            score = -self.__negamax(match, depth - 1, -beta, -alpha, ply + 1)
+            match.unmake()
+
+            if self.__stopped:
+                return 0
+
+            if score > best:
+                best = score
+                best_move = move
+
+                if score > alpha:
+                    alpha = score
+
+                    if alpha >= beta:
+                        break
+
+        if table is not None:
+            if best <= original_alpha:
+                flag = UPPER_BOUND
+            elif best >= beta:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+
+            table.store(key, depth, score_to_table(best, ply), flag, best_move)
+
+        return best
+
+    def evaluate(self, match: GameMatch) -> int:
+        return self.__evaluator.evaluate(match)
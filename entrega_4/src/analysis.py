@@ -0,0 +1,257 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Iterable, Iterator
+
+import symmetry
+from game import MOVES, NUM_MOVE_CODES
+from record import GameRecord, decode_record, iter_raw_records
+
+# Análise de arquivos de partidas em fluxo: os registros são lidos um de cada
+# vez, refeitos por GameMatch e transformados em um registro por posição, sem
+# nunca carregar um arquivo inteiro na memória. Para usar todos os núcleos, os
+# arquivos são divididos em intervalos de bytes processados em paralelo.
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+
+@dataclass(slots=True)
+class PositionRecord:
+    __hash: int
+    # 0 se é a vez do jogador 0 (o local da partida gravada), 1 se do outro
+    __side: int
+    # resultado da partida para quem joga: WIN, DRAW ou LOSS
+    __outcome: int
+    __move: int
+    __ply: int
+    __length: int
+
+    def get_hash(self) -> int:
+        return self.__hash
+
+    def get_side(self) -> int:
+        return self.__side
+
+    def get_outcome(self) -> int:
+        return self.__outcome
+
+    def get_move(self) -> int:
+        return self.__move
+
+    def get_ply(self) -> int:
+        return self.__ply
+
+    def get_length(self) -> int:
+        return self.__length
+
+
+def iter_positions(record: GameRecord, canonical: bool = False) -> Iterator[PositionRecord]:
+    # uma entrada por jogada, com a posição antes dela. Com `canonical`, a
+    # chave é a da simetria canônica e a jogada fica no mesmo referencial.
+    match = record.create_match()
+    winner = record.get_winner()
+    length = record.get_length()
+
+    for ply, code in enumerate(record.get_moves()):
+        side = 0 if match.get_local_turn() else 1
+
+        if canonical:
+            key, transform = symmetry.canonical_hash(match)
+            move = symmetry.transform_code(code, transform)
+        else:
+            key, move = match.get_hash(), code
+
+        if winner is None:
+            outcome = DRAW
+        elif winner == side:
+            outcome = WIN
+        else:
+            outcome = LOSS
+
+        yield PositionRecord(key, side, outcome, move, ply, length)
+
+        match.play_move(MOVES[code])
+
+        if match.evaluate_round():
+            break
+
+
+def iter_records(paths: Iterable[str]) -> Iterator[GameRecord]:
+    return chain.from_iterable(map(iter_shard_records, ((path, 0, None) for path in paths)))
+
+
+def iter_shard_records(shard: tuple[str, int, int | None]) -> Iterator[GameRecord]:
+    path, start, end = shard
+    return map(decode_record, iter_raw_records(path, start, end))
+
+
+def iter_archive_positions(paths: Iterable[str], canonical: bool = False) -> Iterator[PositionRecord]:
+    for record in iter_records(paths):
+        yield from iter_positions(record, canonical)
+
+
+def split_shards(paths: Iterable[str], shards_per_file: int) -> list[tuple[str, int, int | None]]:
+    # intervalos de bytes de cada arquivo; um registro fica no intervalo
+    # em que ele começa
+    shards = []
+
+    for path in paths:
+        size = os.path.getsize(path)
+        step = max(size // shards_per_file, 1)
+        bounds = list(range(0, size, step))[:shards_per_file]
+
+        for i, start in enumerate(bounds):
+            end = bounds[i + 1] if i + 1 < len(bounds) else None
+            shards.append((path, start, end))
+
+    return shards
+
+
+@dataclass
+class ArchiveStats:
+    __games: int = 0
+    __positions: int = 0
+    __total_length: int = 0
+    # vitórias de quem começou e de quem jogou em segundo
+    __first_wins: int = 0
+    __second_wins: int = 0
+    __draws: int = 0
+    # quantas vezes cada código de movimento foi jogado, e o saldo de
+    # vitórias de quem o jogou
+    __move_counts: list[int] = field(default_factory=lambda: [0] * NUM_MOVE_CODES)
+    __move_scores: list[int] = field(default_factory=lambda: [0] * NUM_MOVE_CODES)
+
+    def add_game(self, record: GameRecord):
+        winner = record.get_winner()
+
+        self.__games += 1
+        self.__total_length += record.get_length()
+
+        if winner is None:
+            self.__draws += 1
+        elif winner == record.get_first():
+            self.__first_wins += 1
+        else:
+            self.__second_wins += 1
+
+    def add_position(self, position: PositionRecord):
+        move = position.get_move()
+
+        self.__positions += 1
+        self.__move_counts[move] += 1
+        self.__move_scores[move] += position.get_outcome()
+
+    def merge(self, other: "ArchiveStats"):
+        self.__games += other.__games
+        self.__positions += other.__positions
+        self.__total_length += other.__total_length
+        self.__first_wins += other.__first_wins
+        self.__second_wins += other.__second_wins
+        self.__draws += other.__draws
+
+        for code in range(NUM_MOVE_CODES):
+            self.__move_counts[code] += other.__move_counts[code]
+            self.__move_scores[code] += other.__move_scores[code]
+
+    def get_games(self) -> int:
+        return self.__games
+
+    def get_positions(self) -> int:
+        return self.__positions
+
+    def get_first_wins(self) -> int:
+        return self.__first_wins
+
+    def get_second_wins(self) -> int:
+        return self.__second_wins
+
+    def get_draws(self) -> int:
+        return self.__draws
+
+    def get_average_length(self) -> float:
+        if not self.__games:
+            return 0.0
+        return self.__total_length / self.__games
+
+    def get_move_count(self, code: int) -> int:
+        return self.__move_counts[code]
+
+    def get_move_score(self, code: int) -> float:
+        # média do resultado para quem jogou `code`, entre -1 e 1
+        count = self.__move_counts[code]
+        if not count:
+            return 0.0
+        return self.__move_scores[code] / count
+
+    def get_top_moves(self, count: int = 5) -> list[int]:
+        codes = sorted(range(NUM_MOVE_CODES), key=self.__move_counts.__getitem__, reverse=True)
+        return [code for code in codes[:count] if self.__move_counts[code]]
+
+    def __str__(self) -> str:
+        games = max(self.__games, 1)
+        lines = [
+            f"{self.__games} games, {self.__positions} positions, "
+            f"average length {self.get_average_length():.1f}",
+            f"first player wins: {self.__first_wins} ({self.__first_wins / games:.1%}), "
+            f"second player wins: {self.__second_wins} ({self.__second_wins / games:.1%}), "
+            f"no winner: {self.__draws} ({self.__draws / games:.1%})",
+            "most played moves:",
+        ]
+
+        for code in self.get_top_moves():
+            lines.append(
+                f"  {code}: {self.__move_counts[code]} times, "
+                f"score {self.get_move_score(code):+.2f}"
+            )
+
+        return "\n".join(lines)
+
+
+def analyze_records(records: Iterable[GameRecord]) -> ArchiveStats:
+    stats = ArchiveStats()
+
+    for record in records:
+        stats.add_game(record)
+
+        for position in iter_positions(record):
+            stats.add_position(position)
+
+    return stats
+
+
+def analyze_shard(shard: tuple[str, int, int | None]) -> ArchiveStats:
+    return analyze_records(iter_shard_records(shard))
+
+
+def analyze(paths: list[str], workers: int | None = None, shards_per_file: int | None = None) -> ArchiveStats:
+    if workers == 1:
+        return analyze_records(iter_records(paths))
+
+    workers = workers or os.cpu_count() or 1
+    shards = split_shards(paths, shards_per_file or workers * 4)
+    stats = ArchiveStats()
+
+    with ProcessPoolExecutor(workers) as executor:
+        for partial in executor.map(analyze_shard, shards):
+            stats.merge(partial)
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estatísticas de arquivos de partidas do Conjunto")
+    parser.add_argument("archives", nargs="+", help="arquivos de partidas gerados por record.py")
+    parser.add_argument("--workers", type=int, help="processos (padrão: todos os núcleos)")
+    parser.add_argument("--shards", type=int, help="pedaços por arquivo (padrão: 4 por processo)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = analyze(args.archives, args.workers, args.shards)
+
+    print(stats)
+    print(f"analyzed in {time.perf_counter() - start:.2f}s")
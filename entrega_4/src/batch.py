@@ -0,0 +1,57 @@
+from typing import Iterable
+
+import numpy as np
+
+import bitboard as bb
+from game import Board
+
+# (10, 4): índices das células de cada linha, na ordem de bitboard.LINES
+LINE_INDICES = np.array(bb.LINES, dtype=np.intp)
+
+RING_WEIGHTS = np.array([1 << ring for ring in range(bb.RING_BITS)], dtype=np.uint8)
+CELL_SHIFTS = np.array(
+    [index * bb.RING_BITS for index in range(bb.NUM_CELLS)], dtype=np.uint64
+)
+
+
+def bits_to_cell_masks(bits: Iterable[int]) -> np.ndarray:
+    # inteiros de tabuleiro (Board.get_bits()) para um array (N, 16) de máscaras
+    packed = np.fromiter(bits, dtype=np.uint64)
+
+    return ((packed[:, None] >> CELL_SHIFTS) & np.uint64(bb.CELL_MASK)).astype(np.uint8)
+
+
+def boards_to_cell_masks(boards: Iterable[Board]) -> np.ndarray:
+    return bits_to_cell_masks(board.get_bits() for board in boards)
+
+
+def to_cell_masks(positions: np.ndarray) -> np.ndarray:
+    # aceita (N, 16) com a máscara de cada célula ou (N, 16, 3) com um valor
+    # booleano por cor, na ordem vermelho, verde, azul
+    positions = np.asarray(positions)
+
+    if positions.ndim == 2 and positions.shape[1] == bb.NUM_CELLS:
+        return positions.astype(np.uint8, copy=False)
+
+    if positions.ndim == 3 and positions.shape[1:] == (bb.NUM_CELLS, bb.RING_BITS):
+        return (positions.astype(bool) * RING_WEIGHTS).sum(axis=2, dtype=np.uint8)
+
+    raise ValueError(
+        f"Expected an (N, 16) or (N, 16, 3) array, got shape {positions.shape}"
+    )
+
+
+def check_end_conditions(positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # versão vetorizada de Board.check_end_condition: devolve um array (N,)
+    # indicando quais tabuleiros têm uma linha fechada e outro com o índice
+    # da primeira linha fechada em bitboard.LINES, ou -1
+    masks = to_cell_masks(positions)
+
+    lines = masks[:, LINE_INDICES]
+    first = lines[:, :, 0]
+    winning = (first != 0) & (lines == first[:, :, None]).all(axis=2)
+
+    won = winning.any(axis=1)
+    line = np.where(won, winning.argmax(axis=1), -1).astype(np.int8)
+
+    return won, line
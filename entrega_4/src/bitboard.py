@@ -0,0 +1,176 @@
+NUM_ROWS = 4
+NUM_COLS = 4
+NUM_CELLS = NUM_ROWS * NUM_COLS
+
+# anéis de cada cor que cada jogador recebe no início da partida
+MAX_RING_AMOUNT = 16
+
+# cada célula ocupa 3 bits consecutivos do inteiro do tabuleiro, um por cor
+RING_BITS = 3
+CELL_MASK = (1 << RING_BITS) - 1
+FULL_BOARD = (1 << (NUM_CELLS * RING_BITS)) - 1
+
+# mascara com o bit mais baixo de cada célula ligado
+CELL_LOW_BITS = sum(1 << (index * RING_BITS) for index in range(NUM_CELLS))
+
+
+def cell_index(pos: tuple[int, int]) -> int:
+    return pos[0] * NUM_COLS + pos[1]
+
+
+def cell_pos(index: int) -> tuple[int, int]:
+    return divmod(index, NUM_COLS)
+
+
+POSITIONS = tuple(cell_pos(index) for index in range(NUM_CELLS))
+
+
+def cell_shift(index: int) -> int:
+    return index * RING_BITS
+
+
+def get_cell_mask(bits: int, index: int) -> int:
+    return (bits >> (index * RING_BITS)) & CELL_MASK
+
+
+def set_cell_mask(bits: int, index: int, mask: int) -> int:
+    shift = index * RING_BITS
+    return (bits & ~(CELL_MASK << shift)) | (mask << shift)
+
+
+def _build_lines() -> tuple[tuple[int, ...], ...]:
+    rows = [
+        tuple(i * NUM_COLS + j for j in range(NUM_COLS))
+        for i in range(NUM_ROWS)
+    ]
+    columns = [
+        tuple(i * NUM_COLS + j for i in range(NUM_ROWS))
+        for j in range(NUM_COLS)
+    ]
+    diagonals = [
+        tuple(i * NUM_COLS + i for i in range(NUM_ROWS)),
+        tuple((NUM_ROWS - 1 - i) * NUM_COLS + i for i in range(NUM_ROWS)),
+    ]
+    return tuple(rows + columns + diagonals)
+
+
+# linhas na mesma ordem de Board.get_rows() + get_columns() + get_diagonals()
+LINES = _build_lines()
+
+LINE_MASKS = tuple(
+    sum(CELL_MASK << (index * RING_BITS) for index in line)
+    for line in LINES
+)
+# multiplicar a máscara de uma célula por este valor a replica em toda a linha
+LINE_SPREADS = tuple(
+    sum(1 << (index * RING_BITS) for index in line)
+    for line in LINES
+)
+LINE_SHIFTS = tuple(line[0] * RING_BITS for line in LINES)
+
+LINES_THROUGH = tuple(
+    tuple(line_id for line_id, line in enumerate(LINES) if index in line)
+    for index in range(NUM_CELLS)
+)
+
+
+def is_winning_line(bits: int, line_id: int) -> bool:
+    first = (bits >> LINE_SHIFTS[line_id]) & CELL_MASK
+
+    return first != 0 and bits & LINE_MASKS[line_id] == first * LINE_SPREADS[line_id]
+
+
+def find_winning_line(bits: int, changed: int = FULL_BOARD) -> int | None:
+    # só testa as linhas que contém algum bit de `changed`
+    for line_id, line_mask in enumerate(LINE_MASKS):
+        if not line_mask & changed:
+            continue
+
+        first = (bits >> LINE_SHIFTS[line_id]) & CELL_MASK
+
+        if first and bits & line_mask == first * LINE_SPREADS[line_id]:
+            return line_id
+
+    return None
+
+
+DIRECTIONS = (
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1), (0, 1),
+    (1, -1), (1, 0), (1, 1),
+)
+
+CELL_MASKS = tuple(CELL_MASK << (index * RING_BITS) for index in range(NUM_CELLS))
+
+
+def _build_rays() -> tuple[tuple[tuple[int, ...], ...], ...]:
+    rays = []
+
+    for index in range(NUM_CELLS):
+        i, j = cell_pos(index)
+        origin_rays = []
+
+        for di, dj in DIRECTIONS:
+            ray = []
+            x, y = i + di, j + dj
+
+            while 0 <= x < NUM_ROWS and 0 <= y < NUM_COLS:
+                ray.append(x * NUM_COLS + y)
+                x, y = x + di, y + dj
+
+            if ray:
+                origin_rays.append(tuple(ray))
+
+        rays.append(tuple(origin_rays))
+
+    return tuple(rays)
+
+
+# para cada origem, as células de cada direção em ordem de distância
+RAYS = _build_rays()
+
+
+def _build_paths() -> tuple[int, ...]:
+    paths = [0] * (NUM_CELLS * NUM_CELLS)
+
+    for origin in range(NUM_CELLS):
+        for ray in RAYS[origin]:
+            path = 0
+
+            for destination in ray:
+                path |= CELL_MASKS[destination]
+                paths[origin * NUM_CELLS + destination] = path
+
+    return tuple(paths)
+
+
+# PATHS[origin * 16 + destination] tem os bits das células entre a origem
+# (exclusive) e o destino (inclusive); 0 quando não estão alinhadas
+PATHS = _build_paths()
+
+
+def can_move(bits: int, origin: int, destination: int) -> bool:
+    path = PATHS[origin * NUM_CELLS + destination]
+
+    return path != 0 and not bits & path
+
+
+def reachable_from(bits: int, origin: int) -> int:
+    reachable = 0
+
+    for ray in RAYS[origin]:
+        for destination in ray:
+            if bits & CELL_MASKS[destination]:
+                break
+
+            reachable |= 1 << destination
+
+    return reachable
+
+
+def iter_cells(cell_set: int):
+    # percorre os índices ligados em uma máscara de 16 bits (um bit por célula)
+    while cell_set:
+        low = cell_set & -cell_set
+        yield low.bit_length() - 1
+        cell_set ^= low
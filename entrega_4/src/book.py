@@ -0,0 +1,187 @@
+import argparse
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import bitboard as bb
+import symmetry
+from game import MOVES, GameMatch, Movement, Player, available_mask, legal_codes
+
+# Livro de aberturas: a melhor jogada, encontrada por uma busca longa, para
+# cada posição das primeiras jogadas. Como na tabela de finais, o valor de uma
+# posição depende só do tabuleiro, então a chave é o tabuleiro canônico (a
+# menor das 8 simetrias) e a jogada é guardada no referencial dele.
+#
+# O arquivo tem um cabeçalho, as chaves em ordem crescente (uint64) e os
+# códigos das jogadas (uint16) na mesma ordem.
+
+MAGIC = b"CJBK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+
+DEFAULT_PLIES = 3
+DEFAULT_TIME = 2.0
+
+
+def iter_book_positions(plies: int) -> list[int]:
+    # tabuleiros canônicos alcançáveis em menos de `plies` jogadas
+    positions = set()
+    level = {0}
+
+    for ply in range(plies):
+        positions |= level
+
+        if ply == plies - 1:
+            break
+
+        children = set()
+
+        for bits in level:
+            if bb.find_winning_line(bits) is not None:
+                continue
+
+            match = create_match(bits)
+
+            for code in match.legal_move_codes(match.get_current_player()):
+                match.make_code(code)
+                children.add(symmetry.canonicalize(match.get_board().get_bits())[0])
+                match.unmake()
+
+        level = children - positions
+
+    return sorted(bits for bits in positions if bb.find_winning_line(bits) is None)
+
+
+def create_match(bits: int) -> GameMatch:
+    match = GameMatch(True, Player("book", "1"), Player("book", "2"))
+    match.get_board().set_bits(bits)
+    return match
+
+
+def search_position(task: tuple[int, float, int]) -> tuple[int, int]:
+    # importado aqui porque as engines usam este módulo para consultar o livro
+    from alphabeta import AlphaBetaEngine
+
+    bits, time_budget, max_depth = task
+    engine = AlphaBetaEngine(time_budget=time_budget, max_depth=max_depth)
+    move = engine.choose_move(create_match(bits))
+
+    return bits, move.get_code()
+
+
+def generate(
+    path: str,
+    plies: int = DEFAULT_PLIES,
+    time_budget: float = DEFAULT_TIME,
+    max_depth: int = 64,
+    workers: int | None = None,
+    log=print
+):
+    positions = iter_book_positions(plies)
+    entries: dict[int, int] = {}
+    start = time.perf_counter()
+
+    log(f"{len(positions)} positions to search")
+
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [
+            executor.submit(search_position, (bits, time_budget, max_depth))
+            for bits in positions
+        ]
+
+        for future in as_completed(futures):
+            bits, code = future.result()
+            entries[bits] = code
+
+            if len(entries) % 10 == 0 or len(entries) == len(positions):
+                log(f"{len(entries)}/{len(positions)} in {time.perf_counter() - start:.0f}s")
+
+    write_book(path, plies, entries)
+
+
+def write_book(path: str, plies: int, entries: dict[int, int]):
+    keys = array("Q", sorted(entries))
+    moves = array("H", (entries[bits] for bits in keys))
+
+    # o arquivo é sempre little-endian
+    if sys.byteorder == "big":
+        keys.byteswap()
+        moves.byteswap()
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, plies, len(keys)))
+        file.write(keys.tobytes())
+        file.write(moves.tobytes())
+
+
+class OpeningBook:
+    __plies: int
+    __keys: array
+    __moves: array
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            data = file.read()
+
+        magic, version, plies, count = HEADER.unpack_from(data, 0)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' is not a Conjunto opening book")
+
+        keys_end = HEADER.size + 8 * count
+
+        self.__plies = plies
+        self.__keys = array("Q", data[HEADER.size:keys_end])
+        self.__moves = array("H", data[keys_end:keys_end + 2 * count])
+
+        if sys.byteorder == "big":
+            self.__keys.byteswap()
+            self.__moves.byteswap()
+
+    def get_plies(self) -> int:
+        return self.__plies
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def probe_bits(self, bits: int) -> int | None:
+        # código da jogada do livro no referencial de `bits`, ou None
+        canonical, transform = symmetry.canonicalize(bits)
+        keys = self.__keys
+        i = bisect_left(keys, canonical)
+
+        if i == len(keys) or keys[i] != canonical:
+            return None
+
+        return symmetry.transform_code(self.__moves[i], symmetry.inverse(transform))
+
+    def lookup(self, match: GameMatch) -> Movement | None:
+        bits = match.get_board().get_bits()
+        code = self.probe_bits(bits)
+
+        if code is None:
+            return None
+
+        # o livro ignora as quantidades de anéis, então confere se a jogada
+        # ainda é possível para o jogador da vez
+        amounts = match.get_current_player().get_ring_amounts()
+
+        if code not in legal_codes(bits, available_mask(amounts)):
+            return None
+
+        return MOVES[code]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera o livro de aberturas do Conjunto")
+    parser.add_argument("output", help="arquivo de saída")
+    parser.add_argument("--plies", type=int, default=DEFAULT_PLIES, help="jogadas cobertas a partir do início")
+    parser.add_argument("--time", type=float, default=DEFAULT_TIME, help="tempo de busca por posição, em segundos")
+    parser.add_argument("--max-depth", type=int, default=64)
+    parser.add_argument("--workers", type=int, help="processos (padrão: todos os núcleos)")
+    args = parser.parse_args()
+
+    generate(args.output, args.plies, args.time, args.max_depth, args.workers)
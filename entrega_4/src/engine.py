@@ -0,0 +1,101 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from book import OpeningBook
+from game import GameMatch, Movement
+
+
+@dataclass
+class SearchStats:
+    __nodes: int = 0
+    __depth: int = 0
+    __elapsed: float = 0.0
+    __score: float = 0.0
+    # o que é contado em `nodes`: nós de busca ou simulações (playouts)
+    __unit: str = "nodes"
+    # a jogada veio do livro de aberturas, sem busca
+    __book: bool = False
+
+    def get_nodes(self) -> int:
+        return self.__nodes
+
+    def get_depth(self) -> int:
+        return self.__depth
+
+    def get_elapsed(self) -> float:
+        return self.__elapsed
+
+    def get_score(self) -> float:
+        return self.__score
+
+    def get_unit(self) -> str:
+        return self.__unit
+
+    def is_book_move(self) -> bool:
+        return self.__book
+
+    def get_nodes_per_second(self) -> float:
+        if self.__elapsed <= 0:
+            return 0.0
+        return self.__nodes / self.__elapsed
+
+    def __str__(self) -> str:
+        if self.__book:
+            return "opening book move"
+
+        return (
+            f"depth {self.__depth}, score {self.__score:g}, "
+            f"{self.__nodes} {self.__unit} in {self.__elapsed:.3f}s "
+            f"({self.get_nodes_per_second():.0f} {self.__unit}/s)"
+        )
+
+
+class Engine(ABC):
+    __last_stats: SearchStats
+    __book: OpeningBook | None
+    # pedido de outra thread para a busca terminar o quanto antes
+    __stop_requested: bool
+
+    def __init__(self, book: OpeningBook | None = None):
+        self.__last_stats = SearchStats()
+        self.__book = book
+        self.__stop_requested = False
+
+    def get_name(self) -> str:
+        return type(self).__name__
+
+    def get_last_stats(self) -> SearchStats:
+        return self.__last_stats
+
+    def set_last_stats(self, stats: SearchStats):
+        self.__last_stats = stats
+
+    def request_stop(self):
+        self.__stop_requested = True
+
+    def clear_stop(self):
+        self.__stop_requested = False
+
+    def is_stop_requested(self) -> bool:
+        return self.__stop_requested
+
+    def get_book(self) -> OpeningBook | None:
+        return self.__book
+
+    def book_move(self, match: GameMatch) -> Movement | None:
+        # as engines consultam o livro antes de buscar
+        if self.__book is None:
+            return None
+
+        move = self.__book.lookup(match)
+
+        if move is not None:
+            self.set_last_stats(SearchStats(0, 0, 0.0, 0.0, "nodes", True))
+
+        return move
+
+    @abstractmethod
+    def choose_move(self, match: GameMatch) -> Movement | None:
+        # escolhe um movimento para o jogador da vez; a partida deve ser
+        # devolvida no mesmo estado em que foi recebida
+        ...
@@ -0,0 +1,24 @@
+from alphabeta import AlphaBetaEngine
+from book import OpeningBook
+from engine import Engine
+from mcts import MCTSEngine
+from tablebase import Tablebase
+
+ENGINES: dict[str, type[Engine]] = {
+    "alphabeta": AlphaBetaEngine,
+    "mcts": MCTSEngine,
+}
+
+
+def create_engine(
+    name: str,
+    time_budget: float,
+    tablebase: Tablebase | None = None,
+    book: OpeningBook | None = None
+) -> Engine:
+    engine_type = ENGINES.get(name)
+
+    if engine_type is None:
+        raise ValueError(f"Unknown engine '{name}'")
+
+    return engine_type(time_budget=time_budget, tablebase=tablebase, book=book)
@@ -0,0 +1,173 @@
+from collections import OrderedDict
+
+import bitboard as bb
+from book import OpeningBook
+from game import MOVES, GameMatch, MatchSnapshot, Movement
+
+WIN_SCORE = 1_000_000
+
+# pesos da avaliação, do ponto de vista de quem joga
+THREAT_SCORE = 100
+PAIR_SCORE = 10
+RING_SCORE = 2
+MOBILITY_SCORE = 1
+
+DEFAULT_CACHE_SIZE = 1 << 16
+
+# LINE_CELL_SHIFTS[line_id] são os deslocamentos das quatro células da linha
+LINE_CELL_SHIFTS = tuple(
+    tuple(index * bb.RING_BITS for index in line)
+    for line in bb.LINES
+)
+
+
+def score_lines(bits: int) -> int:
+    # uma linha com três células iguais é uma ameaça que o jogador da vez pode
+    # tentar completar; duas iguais com o resto vazio são um começo de linha
+    score = 0
+
+    for shifts in LINE_CELL_SHIFTS:
+        masks = [(bits >> shift) & bb.CELL_MASK for shift in shifts]
+
+        for mask in masks:
+            if not mask:
+                continue
+
+            count = masks.count(mask)
+
+            if count == 3:
+                score += THREAT_SCORE
+                break
+            if count == 2 and masks.count(0) == 2:
+                score += PAIR_SCORE
+                break
+
+    return score
+
+
+def count_relocations(bits: int) -> int:
+    # mesmo critério de Cell.can_move_to, pelas tabelas de caminhos
+    moves = 0
+    cells = bits
+
+    for index in range(bb.NUM_CELLS):
+        if cells & bb.CELL_MASK:
+            moves += bb.reachable_from(bits, index).bit_count()
+        cells >>= bb.RING_BITS
+
+    return moves
+
+
+def score_position(bits: int, mover_amounts: tuple[int, ...], other_amounts: tuple[int, ...]) -> int:
+    return (
+        score_lines(bits)
+        + RING_SCORE * (sum(mover_amounts) - sum(other_amounts))
+        + MOBILITY_SCORE * count_relocations(bits)
+    )
+
+
+class Evaluator:
+    # Avaliação heurística com um cache LRU limitado, indexado pela chave
+    # zobrist da posição (a mesma de GameMatch.get_hash).
+    __cache: OrderedDict[int, int]
+    __max_entries: int
+    __book: OpeningBook | None
+
+    __hits: int
+    __misses: int
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, book: OpeningBook | None = None):
+        self.__cache = OrderedDict()
+        self.__max_entries = max_entries
+        self.__book = book
+        self.reset_counters()
+
+    def evaluate(self, match: GameMatch) -> int:
+        return self.__evaluate(
+            match.get_hash(),
+            match.get_board().get_bits(),
+            match.get_current_player().get_ring_amounts(),
+            match.get_waiting_player().get_ring_amounts()
+        )
+
+    def evaluate_snapshot(self, snapshot: MatchSnapshot) -> int:
+        return self.__evaluate(
+            snapshot.get_hash(),
+            snapshot.get_bits(),
+            snapshot.get_current_amounts(),
+            snapshot.get_waiting_amounts()
+        )
+
+    def __evaluate(
+        self,
+        key: int,
+        bits: int,
+        mover_amounts: tuple[int, ...],
+        other_amounts: tuple[int, ...]
+    ) -> int:
+        cache = self.__cache
+        score = cache.get(key)
+
+        if score is not None:
+            cache.move_to_end(key)
+            self.__hits += 1
+            return score
+
+        self.__misses += 1
+        score = score_position(bits, mover_amounts, other_amounts)
+
+        cache[key] = score
+
+        if len(cache) > self.__max_entries:
+            cache.popitem(last=False)
+
+        return score
+
+    def rank_moves(self, match: GameMatch) -> list[tuple[int, Movement]]:
+        # movimentos do jogador da vez, do melhor para o pior, com o score do
+        # ponto de vista dele. Uma jogada que fecha uma linha vem primeiro, e
+        # nas aberturas a jogada do livro vem antes das outras.
+        ranked = []
+        book_move = self.__book.lookup(match) if self.__book is not None else None
+
+        for code in match.legal_move_codes(match.get_current_player()):
+            match.make_code(code)
+
+            if match.get_board().winning_line() is not None:
+                score = WIN_SCORE
+            else:
+                score = -self.evaluate(match)
+
+            match.unmake()
+            ranked.append((score, MOVES[code]))
+
+        ranked.sort(key=lambda item: (item[1] is book_move, item[0]), reverse=True)
+
+        return ranked
+
+    def get_hits(self) -> int:
+        return self.__hits
+
+    def get_misses(self) -> int:
+        return self.__misses
+
+    def get_hit_rate(self) -> float:
+        total = self.__hits + self.__misses
+
+        if not total:
+            return 0.0
+        return self.__hits / total
+
+    def get_size(self) -> int:
+        return len(self.__cache)
+
+    def get_max_entries(self) -> int:
+        return self.__max_entries
+
+    def reset_counters(self):
+        self.__hits = 0
+        self.__misses = 0
+
+    def clear(self):
+        self.__cache.clear()
+        self.reset_counters()
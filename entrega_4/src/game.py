@@ -1,7 +1,10 @@
 from dataclasses import dataclass, field
 from enum import Enum
 from dog import StartStatus
-from typing import Any, Union
+from typing import Any, Iterator, Union
+
+import bitboard as bb
+import zobrist
 
 
 class MoveType(Enum):
@@ -9,11 +12,14 @@ class MoveType(Enum):
     MOVE_CELL_CONTENT = 1
 
 class Movement:
+    __slots__ = ("__match_status", "__type", "__ring_type", "__origin", "__destination", "__code")
+
     __match_status: str | None
     __type: MoveType
     __ring_type: Union["RingType", None]
     __origin: tuple[int, int] | None
     __destination: tuple[int, int]
+    __code: int | None
 
     def __init__(
         self,
@@ -28,6 +34,7 @@ class Movement:
         self.__origin = origin
         self.__destination = destination
         self.__match_status = match_status
+        self.__code = None
 
     def get_move_type(self) -> MoveType:
         return self.__type
@@ -40,12 +47,24 @@ class Movement:
 
     def get_destination_pos(self) -> tuple[int, int]:
         return self.__destination
+
+    def get_code(self) -> int:
+        if self.__code is None:
+            self.__code = move_code(self)
+        return self.__code
     
     def get_match_status(self) -> str:
         return self.__match_status
     
-    def set_match_status(self, match_status: str):
-        self.__match_status = match_status
+    def with_match_status(self, match_status: str) -> "Movement":
+        # os movimentos são imutáveis e podem ser compartilhados (ver MOVES)
+        return Movement(
+            self.__type,
+            self.__destination,
+            self.__origin,
+            self.__ring_type,
+            match_status
+        )
     
     def to_dict(self):
         return {
@@ -73,26 +92,193 @@ class Movement:
         )
 
 
-def sign(x: int | float) -> int:
-    if x > 0:
-        return 1
-    if x < 0:
-        return -1
-    return 0
-
 class RingType(Enum):
     RED = "red"
     BLUE = "blue"
     GREEN = "green"
 
 
-@dataclass
+# bit de cada cor dentro dos 3 bits de uma célula
+RING_MASKS: dict[RingType, int] = {
+    RingType.RED: 0b001,
+    RingType.GREEN: 0b010,
+    RingType.BLUE: 0b100,
+}
+
+# um frozenset por combinação de cores, compartilhado por todas as células
+RING_SETS: tuple[frozenset[RingType], ...] = tuple(
+    frozenset(ring_type for ring_type, bit in RING_MASKS.items() if mask & bit)
+    for mask in range(bb.CELL_MASK + 1)
+)
+
+# mesmo conteúdo de RING_SETS, mas com ordem de iteração fixa
+RING_TUPLES: tuple[tuple[RingType, ...], ...] = tuple(
+    tuple(ring_type for ring_type, bit in RING_MASKS.items() if mask & bit)
+    for mask in range(bb.CELL_MASK + 1)
+)
+
+RING_INDEX: dict[RingType, int] = {
+    ring_type: mask.bit_length() - 1 for ring_type, mask in RING_MASKS.items()
+}
+
+
+def ring_set_mask(ring_set: set[RingType] | frozenset[RingType]) -> int:
+    mask = 0
+
+    for ring_type in ring_set:
+        mask |= RING_MASKS[ring_type]
+
+    return mask
+
+
+# Cada movimento tem um código inteiro: as colocações são célula * 3 + índice
+# do anel (0..47) e as realocações vêm em seguida, com origem * 15 + destino,
+# pulando o destino igual à origem.
+RING_ORDER: tuple[RingType, ...] = tuple(sorted(RING_INDEX, key=RING_INDEX.get))
+
+NUM_PLACEMENT_CODES = bb.NUM_CELLS * bb.RING_BITS
+NUM_MOVE_CODES = NUM_PLACEMENT_CODES + bb.NUM_CELLS * (bb.NUM_CELLS - 1)
+
+# CODE_ORIGINS/CODE_DESTINATIONS[code] são índices de células (-1 se não há
+# origem) e CODE_RINGS[code] é o anel colocado, ou None
+CODE_ORIGINS: tuple[int, ...] = tuple(
+    [-1] * NUM_PLACEMENT_CODES
+    + [origin for origin in range(bb.NUM_CELLS) for _ in range(bb.NUM_CELLS - 1)]
+)
+CODE_DESTINATIONS: tuple[int, ...] = tuple(
+    [index for index in range(bb.NUM_CELLS) for _ in RING_ORDER]
+    + [
+        destination
+        for origin in range(bb.NUM_CELLS)
+        for destination in range(bb.NUM_CELLS)
+        if destination != origin
+    ]
+)
+CODE_RINGS: tuple[RingType | None, ...] = tuple(
+    list(RING_ORDER) * bb.NUM_CELLS + [None] * (NUM_MOVE_CODES - NUM_PLACEMENT_CODES)
+)
+
+# RELOCATION_CODES[origin * 16 + destination], -1 se origem == destino
+RELOCATION_CODES: tuple[int, ...] = tuple(
+    -1 if origin == destination
+    else NUM_PLACEMENT_CODES + origin * (bb.NUM_CELLS - 1) + destination - (destination > origin)
+    for origin in range(bb.NUM_CELLS)
+    for destination in range(bb.NUM_CELLS)
+)
+
+# PLACEMENT_CODES[index][free] são as colocações na célula `index` para a
+# máscara `free` de cores que faltam nela
+PLACEMENT_CODES: tuple[tuple[tuple[int, ...], ...], ...] = tuple(
+    tuple(
+        tuple(
+            index * bb.RING_BITS + ring_index
+            for ring_index in range(bb.RING_BITS)
+            if free & (1 << ring_index)
+        )
+        for free in range(bb.CELL_MASK + 1)
+    )
+    for index in range(bb.NUM_CELLS)
+)
+
+
+def placement_code(index: int, ring_type: RingType) -> int:
+    return index * bb.RING_BITS + RING_INDEX[ring_type]
+
+
+def relocation_code(origin: int, destination: int) -> int:
+    return RELOCATION_CODES[origin * bb.NUM_CELLS + destination]
+
+
+def move_code(move: Movement) -> int:
+    destination = bb.cell_index(move.get_destination_pos())
+
+    if move.get_move_type() == MoveType.PLACE_RING:
+        return placement_code(destination, move.get_ring_type())
+
+    return relocation_code(bb.cell_index(move.get_origin_pos()), destination)
+
+
+def available_mask(amounts: tuple[int, ...] | list[int]) -> int:
+    # máscara das cores que ainda restam, com amounts indexado por RING_INDEX
+    mask = 0
+
+    for ring_index, amount in enumerate(amounts):
+        if amount > 0:
+            mask |= 1 << ring_index
+
+    return mask
+
+
+def legal_codes(bits: int, available: int) -> Iterator[int]:
+    # códigos dos movimentos possíveis em `bits` para quem tem as cores de
+    # `available`, na mesma ordem de GameMatch.legal_moves
+    for index in range(bb.NUM_CELLS):
+        mask = (bits >> (index * bb.RING_BITS)) & bb.CELL_MASK
+
+        yield from PLACEMENT_CODES[index][available & ~mask]
+
+        if not mask:
+            continue
+
+        base = index * bb.NUM_CELLS
+
+        for destination in bb.iter_cells(bb.reachable_from(bits, index)):
+            yield RELOCATION_CODES[base + destination]
+
+
+# movimentos compartilhados, um por código. Não devem ser alterados.
+MOVES: tuple[Movement, ...] = tuple(
+    Movement(
+        type=MoveType.PLACE_RING,
+        destination=bb.POSITIONS[CODE_DESTINATIONS[code]],
+        ring_type=CODE_RINGS[code]
+    )
+    if code < NUM_PLACEMENT_CODES
+    else Movement(
+        type=MoveType.MOVE_CELL_CONTENT,
+        destination=bb.POSITIONS[CODE_DESTINATIONS[code]],
+        origin=bb.POSITIONS[CODE_ORIGINS[code]]
+    )
+    for code in range(NUM_MOVE_CODES)
+)
+
+
+def move_code_to_dict(code: int, match_status: str | None = None) -> dict[str, Any]:
+    origin = CODE_ORIGINS[code]
+    ring_type = CODE_RINGS[code]
+
+    return {
+        "match_status": match_status,
+        "type": (MoveType.PLACE_RING if ring_type else MoveType.MOVE_CELL_CONTENT).value,
+        "destination": list(bb.POSITIONS[CODE_DESTINATIONS[code]]),
+        "origin": list(bb.POSITIONS[origin]) if origin >= 0 else None,
+        "ring_type": ring_type.value if ring_type else None,
+    }
+
+
+def move_code_from_dict(value: dict[str, Any]) -> int:
+    destination = bb.cell_index(value["destination"])
+
+    if MoveType(value["type"]) == MoveType.PLACE_RING:
+        return placement_code(destination, RingType(value["ring_type"]))
+
+    code = relocation_code(bb.cell_index(value["origin"]), destination)
+
+    if code < 0:
+        raise ValueError("Movement origin and destination are the same cell")
+
+    return code
+
+
+@dataclass(slots=True)
 class Player:
     __name: str
     __id: str
-    __red_amount: int = field(init=False, default=16)
-    __green_amount: int = field(init=False, default=16)
-    __blue_amount: int = field(init=False, default=16)
+    # quantidades indexadas por RING_INDEX
+    __amounts: list[int] = field(
+        init=False,
+        default_factory=lambda: [bb.MAX_RING_AMOUNT] * len(RING_ORDER)
+    )
 
     def get_name(self) -> str:
         return self.__name
@@ -101,37 +287,90 @@ class Player:
         return self.__id
 
     def get_ring_amount(self, ring_type: RingType) -> int:
-        if ring_type == RingType.RED:
-            return self.__red_amount
-        if ring_type == RingType.GREEN:
-            return self.__green_amount
-        return self.__blue_amount
+        return self.__amounts[RING_INDEX[ring_type]]
 
+    def get_ring_amounts(self) -> tuple[int, int, int]:
+        return tuple(self.__amounts)
 
     def consume_ring(self, ring_type: RingType):
-        if ring_type == RingType.RED:
-            self.__red_amount = max(self.__red_amount - 1, 0)
-        elif ring_type == RingType.GREEN:
-            self.__green_amount = max(self.__green_amount - 1, 0)
-        else:
-            self.__blue_amount = max(self.__blue_amount - 1, 0)
+        ring_index = RING_INDEX[ring_type]
+        self.__amounts[ring_index] = max(self.__amounts[ring_index] - 1, 0)
+
+    def restore_ring(self, ring_type: RingType):
+        self.__amounts[RING_INDEX[ring_type]] += 1
+
+    def set_ring_amounts(self, amounts: tuple[int, int, int]):
+        self.__amounts[:] = amounts
 
 
 class Board:
-    __cells: list["Cell"]
+    __slots__ = (
+        "__bits", "__hash", "__cells",
+        "__version", "__dirty", "__checked_version", "__end_line",
+    )
+
+    __bits: int
+    __hash: int
+    __cells: tuple["Cell", ...] | None
+
+    # estado da verificação incremental de fim de jogo
+    __version: int
+    __dirty: int
+    __checked_version: int
+    __end_line: int | None
 
     def __init__(self):
-        self.__cells = []
+        self.__bits = 0
+        self.__hash = 0
+        self.__cells = None
+
+        self.__version = 0
+        self.__dirty = 0
+        self.__checked_version = 0
+        self.__end_line = None
+
+    def get_bits(self) -> int:
+        return self.__bits
+
+    def set_bits(self, bits: int):
+        if bits & ~bb.FULL_BOARD:
+            raise ValueError(f"Board bits 0x{bits:x} do not fit in {bb.NUM_CELLS} cells")
+
+        changed = self.__bits ^ bits
+
+        if changed:
+            self.__hash ^= zobrist.board_hash_delta(self.__bits, bits)
+            self.__bits = bits
+            self.__dirty |= changed
+            self.__version += 1
+
+    def get_hash(self) -> int:
+        return self.__hash
+
+    def get_version(self) -> int:
+        return self.__version
+
+    def get_cell_mask(self, index: int) -> int:
+        return (self.__bits >> (index * bb.RING_BITS)) & bb.CELL_MASK
+
+    def set_cell_mask(self, index: int, mask: int):
+        self.set_bits(bb.set_cell_mask(self.__bits, index, mask))
 
-        for i in range(4):
-            for j in range(4):
-                self.__cells.append(Cell(self, (i, j)))
-    
     def get_cells(self) -> tuple["Cell", ...]:
-        return tuple(self.__cells)
+        # as células são apenas visões sobre os bits, criadas sob demanda
+        if self.__cells is None:
+            self.__cells = tuple(
+                Cell(self, bb.POSITIONS[index]) for index in range(bb.NUM_CELLS)
+            )
+
+        return self.__cells
     
     def get_cell(self, i: int, j: int) -> "Cell":
-        return self.__cells[i*4 + j]
+        return self.get_cells()[i*4 + j]
+
+    def reachable_from(self, pos: tuple[int, int]) -> int:
+        # máscara de 16 bits com um bit ligado para cada destino possível
+        return bb.reachable_from(self.__bits, bb.cell_index(pos))
 
     def get_rows(self):
         return tuple(
@@ -161,22 +400,43 @@ class Board:
         if not origin_cell.can_move_to(destination_cell):
             return False
         
-        ring_set = origin_cell.get_ring_set()
-        destination_cell.set_ring_set(ring_set)
-        origin_cell.clear()
+        origin_index = bb.cell_index(origin_pos)
+        destination_index = bb.cell_index(destination_pos)
+
+        mask = self.get_cell_mask(origin_index)
+        self.set_cell_mask(destination_index, mask)
+        self.set_cell_mask(origin_index, 0)
 
         return True
     
+    def winning_line(self) -> int | None:
+        if self.__checked_version == self.__version:
+            return self.__end_line
+
+        end_line = self.__end_line
+        dirty = self.__dirty
+
+        if end_line is None:
+            # só as linhas que passam pelas células alteradas podem ter fechado
+            end_line = bb.find_winning_line(self.__bits, dirty)
+        elif bb.LINE_MASKS[end_line] & dirty:
+            end_line = bb.find_winning_line(self.__bits)
+
+        self.__end_line = end_line
+        self.__dirty = 0
+        self.__checked_version = self.__version
+
+        return end_line
+    
     def check_end_condition(self) -> tuple["Cell", ...] | None:
-        sequences = self.get_rows() + self.get_columns() + self.get_diagonals()
+        line_id = self.winning_line()
 
-        for sequence in sequences:
-            a, b, c, d = sequence
+        if line_id is None:
+            return None
 
-            if not a.is_empty() and a == b == c == d:
-                return sequence
-        
-        return None
+        cells = self.get_cells()
+
+        return tuple(cells[index] for index in bb.LINES[line_id])
 
 
     def __repr__(self):
@@ -201,79 +461,87 @@ class Board:
         return "\n".join(lines)
 
 
-@dataclass(init=False)
+@dataclass(init=False, slots=True)
 class Cell:
     __board: Board = field(repr=False)
     __pos: tuple[int, int]
-    __rings: set[RingType]
+    __index: int = field(repr=False)
 
     def __init__(self, board: Board, pos: tuple[int, int]):
         self.__board = board
         self.__pos = pos
-        self.__rings = set()
+        self.__index = bb.cell_index(pos)
     
     def __eq__(self, other: "Cell") -> bool:
-        return self.__rings == other.get_ring_set()
+        return self.get_ring_mask() == other.get_ring_mask()
     
     def get_pos(self) -> tuple[int, int]:
         return self.__pos
 
+    def get_index(self) -> int:
+        return self.__index
+
+    def get_ring_mask(self) -> int:
+        return self.__board.get_cell_mask(self.__index)
+
     def get_ring_set(self) -> set[RingType]:
-        return set(self.__rings)
+        return set(RING_SETS[self.get_ring_mask()])
+
+    def get_ring_view(self) -> frozenset[RingType]:
+        # conjunto somente leitura, compartilhado entre as células com as
+        # mesmas cores; use get_ring_set para ter uma cópia alterável
+        return RING_SETS[self.get_ring_mask()]
     
     def has_ring(self, ring_type: RingType) -> bool:
-        return ring_type in self.__rings
+        return bool(self.get_ring_mask() & RING_MASKS[ring_type])
 
     def is_empty(self) -> bool:
-        return not self.__rings
+        return not self.get_ring_mask()
 
     def insert_ring(self, ring_type: RingType):
-        self.__rings.add(ring_type)
+        mask = self.get_ring_mask() | RING_MASKS[ring_type]
+        self.__board.set_cell_mask(self.__index, mask)
     
     def clear(self):
-        self.__rings.clear()
+        self.__board.set_cell_mask(self.__index, 0)
     
     def set_ring_set(self, ring_set: set[RingType]):
-        self.__rings.clear()
-        self.__rings.update(ring_set)
+        self.__board.set_cell_mask(self.__index, ring_set_mask(ring_set))
 
     def can_move_to(self, other_cell: "Cell") -> bool:
-        pos = self.__pos
-        other_pos = other_cell.get_pos()
-                
-        dx = other_pos[0] - pos[0]
-        dy = other_pos[1] - pos[1]
-
-        valid_direction = dx == 0 or dy == 0 or abs(dx) == abs(dy)
-
-        if pos != other_pos and valid_direction:
-            distance = max(abs(dx), abs(dy))
-
-            for i in range(1, distance + 1):
-                x = pos[0] + i*sign(dx)
-                y = pos[1] + i*sign(dy)
+        bits = self.__board.get_bits()
 
-                cell = self.__board.get_cell(x, y)
-
-                if not cell.is_empty():
-                    return False
-
-            return True
-        
-        return False
+        return bb.can_move(bits, self.__index, other_cell.get_index())
 
 
 class GameMatch:
+    __slots__ = (
+        "__local_turn", "__local_player", "__remote_player", "__board",
+        "__history", "__local_key", "__remote_key",
+    )
+
     __local_turn: bool
     __local_player: Player
     __remote_player: Player
     __board: Board
+    # pilha de make/unmake: bits anteriores do tabuleiro e anel consumido
+    __history: list[int | RingType | None]
+    # chaves zobrist das quantidades de anéis com o jogador local (ou o
+    # remoto) na posição de quem joga
+    __local_key: int
+    __remote_key: int
 
     def __init__(self, local_turn: bool, local_player: Player, remote_player: Player):
         self.__local_turn = local_turn
         self.__local_player = local_player
         self.__remote_player = remote_player
         self.__board = Board()
+        self.__history = []
+
+        local_amounts = local_player.get_ring_amounts()
+        remote_amounts = remote_player.get_ring_amounts()
+        self.__local_key = zobrist.counts_hash(local_amounts, remote_amounts)
+        self.__remote_key = zobrist.counts_hash(remote_amounts, local_amounts)
 
     @classmethod
     def from_start_status(cls, status: StartStatus) -> "GameMatch":
@@ -297,13 +565,88 @@ class GameMatch:
     def get_remote_player(self) -> Player:
         return self.__remote_player
 
+    def get_current_player(self) -> Player:
+        if self.__local_turn:
+            return self.__local_player
+        return self.__remote_player
+
+    def get_waiting_player(self) -> Player:
+        if self.__local_turn:
+            return self.__remote_player
+        return self.__local_player
+
+    def get_hash(self) -> int:
+        if self.__local_turn:
+            return self.__board.get_hash() ^ self.__local_key
+        return self.__board.get_hash() ^ self.__remote_key
+
+    def snapshot(self) -> "MatchSnapshot":
+        return MatchSnapshot(
+            self.__board.get_bits(),
+            self.__local_turn,
+            self.__local_player.get_ring_amounts(),
+            self.__remote_player.get_ring_amounts(),
+            (
+                (self.__local_player.get_name(), self.__local_player.get_id()),
+                (self.__remote_player.get_name(), self.__remote_player.get_id()),
+            ),
+        )
+
+    def restore(self, snapshot: "MatchSnapshot"):
+        # volta a partida para o estado do snapshot, mantendo os jogadores
+        local_amounts = snapshot.get_local_amounts()
+        remote_amounts = snapshot.get_remote_amounts()
+
+        self.__local_player.set_ring_amounts(local_amounts)
+        self.__remote_player.set_ring_amounts(remote_amounts)
+        self.__local_key = zobrist.counts_hash(local_amounts, remote_amounts)
+        self.__remote_key = zobrist.counts_hash(remote_amounts, local_amounts)
+
+        self.__local_turn = snapshot.get_local_turn()
+        self.__board.set_bits(snapshot.get_bits())
+        self.__history.clear()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: "MatchSnapshot") -> "GameMatch":
+        (local_name, local_id), (remote_name, remote_id) = snapshot.get_players()
+
+        match = GameMatch(
+            snapshot.get_local_turn(),
+            Player(local_name, local_id),
+            Player(remote_name, remote_id)
+        )
+        match.restore(snapshot)
+
+        return match
+
+    def __update_count_keys(self, player: Player, ring_type: RingType, old_amount: int):
+        ring_index = RING_INDEX[ring_type]
+        new_amount = player.get_ring_amount(ring_type)
+        slot = 0 if player is self.__local_player else 1
+
+        local_keys = zobrist.COUNT_KEYS[slot][ring_index]
+        remote_keys = zobrist.COUNT_KEYS[1 - slot][ring_index]
+
+        self.__local_key ^= local_keys[old_amount] ^ local_keys[new_amount]
+        self.__remote_key ^= remote_keys[old_amount] ^ remote_keys[new_amount]
+
+    def __consume_ring(self, player: Player, ring_type: RingType):
+        amount = player.get_ring_amount(ring_type)
+        player.consume_ring(ring_type)
+        self.__update_count_keys(player, ring_type, amount)
+
+    def __restore_ring(self, player: Player, ring_type: RingType):
+        amount = player.get_ring_amount(ring_type)
+        player.restore_ring(ring_type)
+        self.__update_count_keys(player, ring_type, amount)
+
     def place_ring(self, ring_type: RingType, destination_pos: tuple[int, int], player: Player):
         destination_cell = self.__board.get_cell(*destination_pos)
 
         present = destination_cell.has_ring(ring_type)
 
         if not present:        
-            player.consume_ring(ring_type)
+            self.__consume_ring(player, ring_type)
 
             destination_cell.insert_ring(ring_type)
 
@@ -323,6 +666,59 @@ class GameMatch:
                 destination=destination_pos,
             )
 
+    def legal_moves(self, player: Player) -> Iterator[Movement]:
+        return map(MOVES.__getitem__, self.legal_move_codes(player))
+
+    def legal_move_codes(self, player: Player) -> Iterator[int]:
+        bits = self.__board.get_bits()
+        return legal_codes(bits, available_mask(player.get_ring_amounts()))
+
+    def make(self, move: Movement):
+        self.make_code(move.get_code())
+
+    def make_code(self, code: int):
+        # aplica um movimento legal do jogador da vez e passa o turno,
+        # mesmo que o movimento encerre a partida
+        board = self.__board
+        history = self.__history
+
+        history.append(board.get_bits())
+
+        destination = CODE_DESTINATIONS[code]
+        ring_type = CODE_RINGS[code]
+
+        if ring_type is not None:
+            player = self.get_current_player()
+
+            board.set_cell_mask(destination, board.get_cell_mask(destination) | RING_MASKS[ring_type])
+
+            if player.get_ring_amount(ring_type) > 0:
+                self.__consume_ring(player, ring_type)
+                history.append(ring_type)
+            else:
+                history.append(None)
+        else:
+            origin = CODE_ORIGINS[code]
+
+            board.set_cell_mask(destination, board.get_cell_mask(origin))
+            board.set_cell_mask(origin, 0)
+            history.append(None)
+
+        self.__local_turn = not self.__local_turn
+
+    def unmake(self):
+        history = self.__history
+
+        consumed = history.pop()
+        bits = history.pop()
+
+        self.__local_turn = not self.__local_turn
+
+        if consumed is not None:
+            self.__restore_ring(self.get_current_player(), consumed)
+
+        self.__board.set_bits(bits)
+
     def receive_move(self, move: Movement):
         move_type = move.get_move_type()
 
@@ -337,6 +733,16 @@ class GameMatch:
 
             self.move_cell_content(origin_pos, destination)
     
+    def play_move(self, move: Movement):
+        # aplica o movimento do jogador da vez pelos mesmos caminhos da
+        # interface: jogadas locais direto na partida e remotas por receive_move
+        if not self.__local_turn:
+            self.receive_move(move)
+        elif move.get_move_type() == MoveType.PLACE_RING:
+            self.place_ring(move.get_ring_type(), move.get_destination_pos(), self.__local_player)
+        else:
+            self.move_cell_content(move.get_origin_pos(), move.get_destination_pos())
+
     def evaluate_round(self):        
         end = self.__board.check_end_condition()
 
@@ -353,3 +759,97 @@ class GameMatch:
         self.__local_turn = not self.__local_turn
         return self.__local_turn
 
+
+
+@dataclass(frozen=True, slots=True)
+class MatchSnapshot:
+    # Estado imutável de uma partida. O tabuleiro é um int e as quantidades
+    # são tuplas, então tirar um snapshot e aplicar um movimento custam O(1)
+    # e os snapshots seguintes reaproveitam tudo que não mudou.
+    __bits: int
+    __local_turn: bool
+    __local_amounts: tuple[int, int, int]
+    __remote_amounts: tuple[int, int, int]
+    # (nome, id) dos jogadores local e remoto
+    __players: tuple[tuple[str, str], tuple[str, str]] = field(repr=False)
+
+    def get_bits(self) -> int:
+        return self.__bits
+
+    def get_local_turn(self) -> bool:
+        return self.__local_turn
+
+    def get_local_amounts(self) -> tuple[int, int, int]:
+        return self.__local_amounts
+
+    def get_remote_amounts(self) -> tuple[int, int, int]:
+        return self.__remote_amounts
+
+    def get_current_amounts(self) -> tuple[int, int, int]:
+        if self.__local_turn:
+            return self.__local_amounts
+        return self.__remote_amounts
+
+    def get_waiting_amounts(self) -> tuple[int, int, int]:
+        if self.__local_turn:
+            return self.__remote_amounts
+        return self.__local_amounts
+
+    def get_players(self) -> tuple[tuple[str, str], tuple[str, str]]:
+        return self.__players
+
+    def get_cell_mask(self, index: int) -> int:
+        return bb.get_cell_mask(self.__bits, index)
+
+    def get_hash(self) -> int:
+        # mesma chave de GameMatch.get_hash
+        return zobrist.position_hash(
+            self.__bits, self.get_current_amounts(), self.get_waiting_amounts()
+        )
+
+    def winning_line(self) -> int | None:
+        return bb.find_winning_line(self.__bits)
+
+    def legal_move_codes(self) -> Iterator[int]:
+        return legal_codes(self.__bits, available_mask(self.get_current_amounts()))
+
+    def legal_moves(self) -> Iterator[Movement]:
+        return map(MOVES.__getitem__, self.legal_move_codes())
+
+    def apply(self, move: Movement) -> "MatchSnapshot":
+        return self.apply_code(move.get_code())
+
+    def apply_code(self, code: int) -> "MatchSnapshot":
+        # mesmas regras de GameMatch.make_code, devolvendo um novo snapshot
+        bits = self.__bits
+        destination = CODE_DESTINATIONS[code]
+        ring_type = CODE_RINGS[code]
+        local_amounts = self.__local_amounts
+        remote_amounts = self.__remote_amounts
+
+        if ring_type is not None:
+            bits |= RING_MASKS[ring_type] << (destination * bb.RING_BITS)
+
+            ring_index = RING_INDEX[ring_type]
+            amounts = self.get_current_amounts()
+
+            if amounts[ring_index] > 0:
+                amounts = amounts[:ring_index] + (amounts[ring_index] - 1,) + amounts[ring_index + 1:]
+
+                if self.__local_turn:
+                    local_amounts = amounts
+                else:
+                    remote_amounts = amounts
+        else:
+            origin = CODE_ORIGINS[code]
+            mask = bb.get_cell_mask(bits, origin)
+
+            bits = bb.set_cell_mask(bb.set_cell_mask(bits, origin, 0), destination, mask)
+
+        return MatchSnapshot(
+            bits,
+            not self.__local_turn,
+            local_amounts,
+            remote_amounts,
+            self.__players,
+        )
@@ -1,5 +1,7 @@
 from enum import Enum, auto
 from random import choice
+import queue
+import threading
 import tkinter as tk
 import requests
 from typing import Any
@@ -7,10 +9,13 @@ import dog
 
 from constants import Constants as c
 from name import ADJECTIVES, NAMES
-from game import Board, Cell, GameMatch, Player, RingType, MoveType, Movement
+from game import Board, Cell, GameMatch, Movement, Player, RingType, MoveType, MOVES, move_code_from_dict
 from button import Button
+from engine import Engine
+from record import GameRecorder, append_record
 from ringstack import RingStack, RingType
 from tile import Tile
+import bitboard as bb
 
 
 class GameStatus(Enum):
@@ -24,6 +29,21 @@ class GamePlayerInterface(dog.DogPlayerInterface):
     __window: tk.Tk
     __canvas: tk.Canvas
     __dog_actor: dog.DogActor
+    __engine: Engine | None
+    __archive: str | None
+    __recorder: GameRecorder | None = None
+
+    # sugestões de jogada calculadas enquanto o usuário pensa
+    __hint_engine: Engine | None
+    __hint_move: Movement | None = None
+
+    # as buscas das engines rodam em uma thread, uma de cada vez
+    __search_thread: threading.Thread | None = None
+    __search_thread_generation: int = 0
+    # cada cancelamento muda a geração, e resultados de gerações antigas
+    # são descartados
+    __search_generation: int = 0
+    __search_queue: queue.Queue
 
     __mounted: dict[str, Any] | None
     __status: GameStatus | None = None
@@ -34,9 +54,21 @@ class GamePlayerInterface(dog.DogPlayerInterface):
     __end_cells: list[Cell] | None = None
     __status_message: str
 
-    def __init__(self):
+    def __init__(
+        self,
+        engine: Engine | None = None,
+        archive: str | None = None,
+        hint_engine: Engine | None = None
+    ):
         super().__init__()
 
+        # quando há uma engine, ela escolhe os movimentos do jogador local
+        self.__engine = engine
+        # arquivo onde as partidas terminadas são gravadas
+        self.__archive = archive
+        self.__hint_engine = hint_engine
+        self.__search_queue = queue.Queue()
+
         width, height = c.DEFAULT_SIZE
         
         self.__window = tk.Tk()
@@ -66,7 +98,9 @@ class GamePlayerInterface(dog.DogPlayerInterface):
         return f"{animal} {adj_pair[gender.value]}"
     
     def clear_match(self):
+        self.cancel_search()
         self.__match = None
+        self.__recorder = None
 
     def restore_initial_state(self):
         self.clear_match()
@@ -178,7 +212,12 @@ class GamePlayerInterface(dog.DogPlayerInterface):
     def initialize_match(self, start_status: dog.StartStatus):
         self.__match = GameMatch.from_start_status(start_status)
 
+        if self.__archive:
+            self.__recorder = GameRecorder(self.__match)
+
         self.mount_match_screen()
+        self.schedule_engine_move()
+        self.start_hint()
 
     
     def mount_match_screen(self):
@@ -316,8 +355,7 @@ class GamePlayerInterface(dog.DogPlayerInterface):
             pos = cell.get_pos()
             tile = self.get_tile(pos)
 
-            ring_set = cell.get_ring_set()
-            tile.update_ring_set(ring_set)
+            tile.update_ring_set(cell.get_ring_view())
         
         self.clear_overlay()
 
@@ -325,6 +363,8 @@ class GamePlayerInterface(dog.DogPlayerInterface):
             self.highlight_possible_movements()
         elif self.__end_cells:
             self.highlight_end_cells()
+        elif self.__hint_move:
+            self.highlight_hint()
         
         for player in (self.__match.get_local_player(), self.__match.get_remote_player()):
             for ring_type in RingType:
@@ -368,17 +408,13 @@ class GamePlayerInterface(dog.DogPlayerInterface):
     def highlight_possible_movements(self):
         board = self.__match.get_board()
 
-        selected_cell = board.get_cell(*self.__selected_cell_pos)
-        cells = board.get_cells()
+        reachable = board.reachable_from(self.__selected_cell_pos)
 
-        for cell in cells:
-            can_move = selected_cell.can_move_to(cell)
-
-            if can_move:
-                pos = cell.get_pos()
-                tile = self.get_tile(pos)
+        for index in bb.iter_cells(reachable):
+            pos = bb.cell_pos(index)
+            tile = self.get_tile(pos)
 
-                tile.highlight_overlay()
+            tile.highlight_overlay()
 
     def highlight_end_cells(self):
         local_turn = self.__match.get_local_turn()
@@ -392,7 +428,25 @@ class GamePlayerInterface(dog.DogPlayerInterface):
             else:
                 tile.defeat_overlay()
 
+    def highlight_hint(self):
+        move = self.__hint_move
+
+        self.get_tile(move.get_destination_pos()).highlight_overlay()
+
+        if move.get_move_type() == MoveType.MOVE_CELL_CONTENT:
+            self.get_tile(move.get_origin_pos()).highlight_overlay()
+
+    def save_record(self):
+        if not self.__recorder:
+            return
+
+        append_record(self.__archive, self.__recorder.get_record())
+        self.__recorder = None
+
     def mount_end_screen(self):
+        self.cancel_search()
+        self.save_record()
+
         board = self.__match.get_board()
         end_cells = board.check_end_condition()
 
@@ -444,7 +498,7 @@ class GamePlayerInterface(dog.DogPlayerInterface):
     def click_ring_stack(self, stack: RingStack):
         # Pre-condição para executar o select ring
 
-        if not self.__match.get_local_turn():
+        if self.__engine or not self.__match.get_local_turn():
             return
         
         if self.__selected_cell_pos:
@@ -455,7 +509,7 @@ class GamePlayerInterface(dog.DogPlayerInterface):
     def click_tile(self, tile: Tile):
         # Pre condição para executar o select destination ou select cell
         
-        if not self.__match.get_local_turn():
+        if self.__engine or not self.__match.get_local_turn():
             return
 
         if self.__selected_ring or self.__selected_cell_pos:
@@ -510,6 +564,8 @@ class GamePlayerInterface(dog.DogPlayerInterface):
         self.__selected_cell_pos = None
 
     def select_destination(self, clicked_pos: tuple[int, int]):
+        self.cancel_search()
+
         ring_type = self.__selected_ring
         selected_pos = self.__selected_cell_pos
 
@@ -528,27 +584,140 @@ class GamePlayerInterface(dog.DogPlayerInterface):
         self.__selected_cell_pos = None
 
         if move is not None:
+            # gravado antes de evaluate_game_end, que salva a partida no fim
+            if self.__recorder:
+                self.__recorder.add(move)
+
             end = self.evaluate_game_end()
 
             if end:
-                move.set_match_status("finished")
+                move = move.with_match_status("finished")
             else:
-                move.set_match_status("next")
+                move = move.with_match_status("next")
             
             move_dict = move.to_dict()
             
             self.__dog_actor.send_move(move_dict)
         
         self.update_match_screen()
+        # uma jogada inválida mantém a vez do usuário
+        self.start_hint()
     
     def receive_move(self, move_dict: dict[str, Any]):
-        move = Movement.from_dict(move_dict)
+        self.cancel_search()
+
+        move = MOVES[move_code_from_dict(move_dict)]
+
+        if self.__recorder:
+            self.__recorder.add_dict(move_dict)
 
         self.__match.receive_move(move)
 
         self.evaluate_game_end()
 
         self.update_match_screen()
+        self.schedule_engine_move()
+        self.start_hint()
+
+    def schedule_engine_move(self):
+        if not self.__engine or not self.__match.get_local_turn():
+            return
+
+        if self.__match.get_board().winning_line() is not None:
+            return
+
+        if not self.start_search(self.__engine, self.play_engine_move):
+            self.__window.after(c.DELAY, self.schedule_engine_move)
+
+    def play_engine_move(self, move: Movement):
+        # a partida pode ter terminado ou sido abandonada durante a busca
+        if self.__status != GameStatus.MATCH or not self.__match.get_local_turn():
+            return
+
+        self.update_status_message(str(self.__engine.get_last_stats()))
+
+        # reaproveita o mesmo caminho das jogadas feitas pelo usuário
+        if move.get_move_type() == MoveType.PLACE_RING:
+            self.__selected_ring = move.get_ring_type()
+        else:
+            self.__selected_cell_pos = move.get_origin_pos()
+
+        self.select_destination(move.get_destination_pos())
+
+    def start_hint(self):
+        if not self.__hint_engine or self.__engine or self.__status != GameStatus.MATCH:
+            return
+
+        if not self.__match.get_local_turn() or self.__match.get_board().winning_line() is not None:
+            return
+
+        if self.__hint_move is not None:
+            return
+
+        if not self.start_search(self.__hint_engine, self.show_hint):
+            self.__window.after(c.DELAY, self.start_hint)
+
+    def start_search(self, engine: Engine, on_result) -> bool:
+        # busca a jogada da vez sem travar o Tk e chama `on_result` com ela.
+        # Devolve False se uma busca cancelada ainda não terminou, já que a
+        # engine não pode ser usada por duas threads.
+        generation = self.__search_generation
+
+        if self.__search_thread and self.__search_thread.is_alive():
+            return self.__search_thread_generation == generation
+
+        # a thread busca em uma cópia, e a partida da interface nunca sai
+        # da thread do Tk
+        snapshot = self.__match.snapshot()
+        engine.clear_stop()
+
+        def search():
+            move = engine.choose_move(GameMatch.from_snapshot(snapshot))
+            self.__search_queue.put((generation, on_result, move))
+
+        self.__search_thread = threading.Thread(target=search, daemon=True)
+        self.__search_thread_generation = generation
+        self.__search_thread.start()
+
+        self.__window.after(c.DELAY, self.poll_search)
+
+        return True
+
+    def poll_search(self):
+        # o Tk só pode ser usado pela própria thread, então o resultado
+        # chega por uma fila consultada periodicamente. O estado da thread é
+        # lido antes da fila para não perder um resultado do último instante.
+        alive = self.__search_thread is not None and self.__search_thread.is_alive()
+
+        try:
+            while True:
+                generation, on_result, move = self.__search_queue.get_nowait()
+
+                if generation == self.__search_generation and move is not None:
+                    on_result(move)
+        except queue.Empty:
+            pass
+
+        if alive:
+            self.__window.after(c.DELAY, self.poll_search)
+
+    def show_hint(self, move: Movement):
+        self.__hint_move = move
+
+        if move.get_move_type() == MoveType.PLACE_RING:
+            self.update_status_message(f"Hint: place a {move.get_ring_type().value} ring")
+        else:
+            self.update_status_message("Hint: move the highlighted rings")
+
+        self.update_match_screen()
+
+    def cancel_search(self):
+        self.__search_generation += 1
+        self.__hint_move = None
+
+        for engine in (self.__engine, self.__hint_engine):
+            if engine:
+                engine.request_stop()
 
     def receive_withdrawal_notification(self):
         self.mount_end_screen()
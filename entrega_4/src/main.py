@@ -1,4 +1,23 @@
+import argparse
+
+from book import OpeningBook
+from engines import ENGINES, create_engine
 from interface import GamePlayerInterface
+from tablebase import Tablebase
+
+parser = argparse.ArgumentParser(description="Conjunto")
+parser.add_argument("--engine", choices=sorted(ENGINES), help="engine que joga no lugar do usuário")
+parser.add_argument("--hint", choices=sorted(ENGINES), help="engine que sugere jogadas ao usuário")
+parser.add_argument("--time", type=float, default=1.0, help="tempo por jogada da engine, em segundos")
+parser.add_argument("--tablebase", help="arquivo da tabela de finais gerado por tablebase.py")
+parser.add_argument("--book", help="arquivo do livro de aberturas gerado por book.py")
+parser.add_argument("--archive", help="arquivo onde as partidas terminadas são gravadas")
+args = parser.parse_args()
+
+tablebase = Tablebase(args.tablebase) if args.tablebase else None
+book = OpeningBook(args.book) if args.book else None
+engine = create_engine(args.engine, args.time, tablebase, book) if args.engine else None
+hint_engine = create_engine(args.hint, args.time, tablebase, book) if args.hint else None
 
-actor = GamePlayerInterface()
-actor.loop()
\ No newline at end of file
+actor = GamePlayerInterface(engine, args.archive, hint_engine)
+actor.loop()
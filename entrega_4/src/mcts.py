@@ -0,0 +1,316 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from random import Random
+
+import bitboard as bb
+from book import OpeningBook
+from engine import Engine, SearchStats
+from game import GameMatch, Movement
+from tablebase import LOSS, WIN, Tablebase
+
+# índices internos das simulações, que não são os códigos de game.MOVES:
+# realocações são origem * 16 + destino (um espaço denso em que os pares sem
+# caminho são rejeitados no sorteio) e colocações são
+# ROLLOUT_PLACEMENT_OFFSET + índice * 4 + índice do anel
+ROLLOUT_PLACEMENT_OFFSET = bb.NUM_CELLS * bb.NUM_CELLS
+
+# ROLLOUT_PLACEMENTS[index][free] tem as colocações possíveis na célula `index`
+# para a máscara `free` de cores que faltam nela
+ROLLOUT_PLACEMENTS: tuple[tuple[tuple[int, ...], ...], ...] = tuple(
+    tuple(
+        tuple(
+            ROLLOUT_PLACEMENT_OFFSET + index * 4 + ring_index
+            for ring_index in range(bb.RING_BITS)
+            if free & (1 << ring_index)
+        )
+        for free in range(bb.CELL_MASK + 1)
+    )
+    for index in range(bb.NUM_CELLS)
+)
+
+# intervalo de simulações entre consultas ao relógio
+TIME_CHECK_INTERVAL = 16
+
+
+class RolloutPolicy(ABC):
+    @abstractmethod
+    def rollout(
+        self,
+        bits: int,
+        mover_amounts: tuple[int, ...],
+        other_amounts: tuple[int, ...],
+        rng: Random
+    ) -> int:
+        # joga a partida até o fim a partir de `bits`. Devolve 1 se quem joga
+        # primeiro vencer, -1 se perder e 0 se não houver resultado
+        ...
+
+
+class RandomRollout(RolloutPolicy):
+    # Sorteia códigos no espaço de todos os movimentos e descarta os ilegais,
+    # o que mantém a distribuição uniforme sem gerar a lista de movimentos.
+    # Depois de muitas rejeições seguidas, gera a lista completa.
+    __max_plies: int
+    __max_samples: int
+    __moves: list[int]
+
+    def __init__(self, max_plies: int = 200, max_samples: int = 64):
+        self.__max_plies = max_plies
+        self.__max_samples = max_samples
+        # reaproveitada entre as jogadas para não alocar uma lista por passo
+        self.__moves = []
+
+    def rollout(
+        self,
+        bits: int,
+        mover_amounts: tuple[int, ...],
+        other_amounts: tuple[int, ...],
+        rng: Random
+    ) -> int:
+        random = rng.random
+        paths = bb.PATHS
+        code_space = ROLLOUT_PLACEMENT_OFFSET + bb.NUM_CELLS * 4
+
+        amounts = (list(mover_amounts), list(other_amounts))
+        available = [
+            sum(1 << ring for ring, amount in enumerate(side) if amount > 0)
+            for side in amounts
+        ]
+        side = 0
+
+        for _ in range(self.__max_plies):
+            side_available = available[side]
+
+            for _ in range(self.__max_samples):
+                code = int(random() * code_space)
+
+                if code >= ROLLOUT_PLACEMENT_OFFSET:
+                    index, ring = divmod(code - ROLLOUT_PLACEMENT_OFFSET, 4)
+
+                    if side_available >> ring & 1 and not bits >> (index * bb.RING_BITS + ring) & 1:
+                        break
+                elif bits & bb.CELL_MASKS[code >> 4]:
+                    path = paths[code]
+
+                    if path and not bits & path:
+                        break
+            else:
+                code = self.__sample_move(bits, side_available, rng)
+
+                if code is None:
+                    return 0
+
+            if code >= ROLLOUT_PLACEMENT_OFFSET:
+                index, ring = divmod(code - ROLLOUT_PLACEMENT_OFFSET, 4)
+                changed = index
+                bits |= 1 << (index * bb.RING_BITS + ring)
+
+                side_amounts = amounts[side]
+                side_amounts[ring] -= 1
+
+                if not side_amounts[ring]:
+                    available[side] &= ~(1 << ring)
+            else:
+                origin, destination = divmod(code, bb.NUM_CELLS)
+                changed = destination
+                mask = (bits >> (origin * bb.RING_BITS)) & bb.CELL_MASK
+                bits &= ~bb.CELL_MASKS[origin]
+                bits |= mask << (destination * bb.RING_BITS)
+
+            if bb.find_winning_line(bits, bb.CELL_MASKS[changed]) is not None:
+                return 1 if side == 0 else -1
+
+            side ^= 1
+
+        return 0
+
+    def __sample_move(self, bits: int, available: int, rng: Random) -> int | None:
+        moves = self.__moves
+        moves.clear()
+
+        for index in range(bb.NUM_CELLS):
+            mask = (bits >> (index * bb.RING_BITS)) & bb.CELL_MASK
+            free = available & ~mask
+
+            if free:
+                moves.extend(ROLLOUT_PLACEMENTS[index][free])
+
+            if mask:
+                base = index * bb.NUM_CELLS
+
+                for destination in bb.iter_cells(bb.reachable_from(bits, index)):
+                    moves.append(base + destination)
+
+        if not moves:
+            return None
+
+        return moves[rng.randrange(len(moves))]
+
+
+class TreeNode:
+    __slots__ = ("move", "parent", "children", "untried", "visits", "value", "terminal")
+
+    move: Movement | None
+    parent: "TreeNode | None"
+    children: list["TreeNode"]
+    untried: list[Movement]
+    visits: int
+    # soma dos resultados do ponto de vista de quem jogou `move`
+    value: float
+    terminal: bool
+
+    def __init__(self, move: Movement | None, parent: "TreeNode | None"):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = []
+        self.visits = 0
+        self.value = 0.0
+        self.terminal = False
+
+
+class MCTSEngine(Engine):
+    __time_budget: float
+    __playouts: int | None
+    __exploration: float
+    __policy: RolloutPolicy
+    __rng: Random
+    __tablebase: Tablebase | None
+
+    def __init__(
+        self,
+        time_budget: float = 1.0,
+        playouts: int | None = None,
+        exploration: float = 1.4,
+        policy: RolloutPolicy | None = None,
+        seed: int | None = None,
+        tablebase: Tablebase | None = None,
+        book: OpeningBook | None = None
+    ):
+        super().__init__(book)
+        self.__time_budget = time_budget
+        self.__playouts = playouts
+        self.__exploration = exploration
+        self.__policy = policy or RandomRollout()
+        self.__rng = Random(seed)
+        self.__tablebase = tablebase
+
+    def get_time_budget(self) -> float:
+        return self.__time_budget
+
+    def choose_move(self, match: GameMatch) -> Movement | None:
+        move = self.book_move(match)
+
+        if move is not None:
+            return move
+
+        start = time.perf_counter()
+        deadline = start + self.__time_budget
+        limit = self.__playouts
+
+        root = TreeNode(None, None)
+        root.untried = list(match.legal_moves(match.get_current_player()))
+
+        if not root.untried:
+            return None
+
+        playouts = 0
+
+        # sempre faz ao menos uma simulação, para que a raiz tenha um filho
+        # mesmo com tempo zero ou com a busca interrompida antes de começar
+        while True:
+            self.__playout(match, root)
+            playouts += 1
+
+            if limit is not None and playouts >= limit:
+                break
+
+            if playouts % TIME_CHECK_INTERVAL == 0 and (
+                self.is_stop_requested()
+                or limit is None and time.perf_counter() >= deadline
+            ):
+                break
+
+        best = max(root.children, key=lambda child: child.visits)
+
+        elapsed = time.perf_counter() - start
+        score = best.value / best.visits
+        self.set_last_stats(SearchStats(playouts, 1, elapsed, score, "playouts"))
+
+        return best.move
+
+    def __playout(self, match: GameMatch, root: TreeNode):
+        rng = self.__rng
+        node = root
+        depth = 0
+
+        while not node.untried and node.children and not node.terminal:
+            node = self.__select(node)
+            match.make(node.move)
+            depth += 1
+
+        if node.untried and not node.terminal:
+            untried = node.untried
+            move = untried.pop(rng.randrange(len(untried)))
+
+            match.make(move)
+            depth += 1
+
+            child = TreeNode(move, node)
+
+            if match.get_board().winning_line() is not None:
+                child.terminal = True
+            else:
+                child.untried = list(match.legal_moves(match.get_current_player()))
+
+            node.children.append(child)
+            node = child
+
+        entry = None
+
+        if not node.terminal and self.__tablebase is not None:
+            entry = self.__tablebase.probe(match)
+
+        if node.terminal:
+            result = 1
+        elif entry is not None:
+            # o valor da tabela é do ponto de vista de quem joga agora
+            value = entry[0]
+            result = -1 if value == WIN else 1 if value == LOSS else 0
+        else:
+            # a simulação é do ponto de vista do adversário de quem jogou `move`
+            result = -self.__policy.rollout(
+                match.get_board().get_bits(),
+                match.get_current_player().get_ring_amounts(),
+                match.get_waiting_player().get_ring_amounts(),
+                rng
+            )
+
+        while node is not None:
+            node.visits += 1
+            node.value += result
+            result = -result
+            node = node.parent
+
+        for _ in range(depth):
+            match.unmake()
+
+    def __select(self, node: TreeNode) -> TreeNode:
+        log_visits = math.log(node.visits)
+        exploration = self.__exploration
+
+        best = None
+        best_score = -math.inf
+
+        for child in node.children:
+            score = (
+                child.value / child.visits
+                + exploration * math.sqrt(log_visits / child.visits)
+            )
+
+            if score > best_score:
+                best = child
+                best_score = score
+
+        return best
@@ -0,0 +1,84 @@
+import argparse
+import gc
+import sys
+import tracemalloc
+from random import Random
+
+from game import MOVES, GameMatch, Movement, MoveType, Player
+
+# Mede a memória ocupada por partidas vivas com tracemalloc: cria muitas
+# partidas com algumas jogadas aleatórias e divide o crescimento do heap pelo
+# número de partidas.
+
+
+def create_match(rng: Random, plies: int) -> GameMatch:
+    match = GameMatch(True, Player("local", "1"), Player("remote", "2"))
+
+    for _ in range(plies):
+        if match.get_board().winning_line() is not None:
+            break
+
+        moves = list(match.legal_move_codes(match.get_current_player()))
+        move = MOVES[rng.choice(moves)]
+
+        if move.get_move_type() == MoveType.PLACE_RING:
+            match.place_ring(move.get_ring_type(), move.get_destination_pos(), match.get_current_player())
+        else:
+            match.move_cell_content(move.get_origin_pos(), move.get_destination_pos())
+
+        match.switch_turn()
+
+    # as células que a interface usa
+    match.get_board().get_cells()
+
+    return match
+
+
+def bytes_per_match(count: int = 10000, plies: int = 12, seed: int = 0) -> float:
+    rng = Random(seed)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    matches = [create_match(rng, plies) for _ in range(count)]
+
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # a própria lista não faz parte das partidas
+    return (after - before - sys.getsizeof(matches)) / count
+
+
+def object_sizes() -> dict[str, int]:
+    match = GameMatch(True, Player("local", "1"), Player("remote", "2"))
+    cell = match.get_board().get_cell(0, 0)
+    move = Movement(MoveType.MOVE_CELL_CONTENT, (0, 1), (0, 0))
+
+    def size(value) -> int:
+        # o objeto e o __dict__, quando existe
+        return sys.getsizeof(value) + sys.getsizeof(getattr(value, "__dict__", None) or ())
+
+    return {
+        "GameMatch": size(match),
+        "Board": size(match.get_board()),
+        "Player": size(match.get_local_player()),
+        "Cell": size(cell),
+        "Movement": size(move),
+        "MatchSnapshot": size(match.snapshot()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede a memória por partida do Conjunto")
+    parser.add_argument("--matches", type=int, default=10000)
+    parser.add_argument("--plies", type=int, default=12, help="jogadas aleatórias em cada partida")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, size in object_sizes().items():
+        print(f"{name}: {size} bytes")
+
+    size = bytes_per_match(args.matches, args.plies, args.seed)
+    print(f"bytes per GameMatch: {size:.0f}")
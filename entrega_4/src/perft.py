@@ -0,0 +1,166 @@
+import argparse
+import copy
+import time
+
+import bitboard as bb
+from game import GameMatch, Player, RingType
+
+# Conta as folhas da árvore de jogadas até uma profundidade fixa. Uma posição
+# com linha fechada encerra a partida e não tem filhos, então só conta como
+# folha se estiver exatamente na profundidade pedida.
+#
+# A versão rápida usa legal_moves e make/unmake; a lenta gera as jogadas
+# testando todas as células com Cell.can_move_to e joga em cópias da partida
+# com place_ring/move_cell_content, passando por Player.consume_ring.
+
+# tabuleiros fixos, em bits; as contagens foram conferidas com perft_slow
+POSITIONS: dict[str, int] = {
+    "start": 0,
+    # anéis espalhados, sem linha fechada
+    "opening": 0x6000_2008_0001,
+    # meio de jogo com anéis bloqueando a maior parte dos caminhos
+    "middle": 0xC011_D41A_8503,
+}
+
+REFERENCE: dict[str, dict[int, int]] = {
+    "start": {1: 48, 2: 2712, 3: 167208, 4: 10911600},
+    "opening": {1: 77, 2: 5748, 3: 421200, 4: 30486856},
+    "middle": {1: 58, 2: 3262, 3: 178516, 4: 9526284},
+}
+
+
+def create_match(bits: int = 0) -> GameMatch:
+    match = GameMatch(True, Player("perft", "1"), Player("perft", "2"))
+    match.get_board().set_bits(bits)
+    return match
+
+
+def perft(match: GameMatch, depth: int) -> int:
+    if depth == 0:
+        return 1
+
+    if match.get_board().winning_line() is not None:
+        return 0
+
+    moves = match.legal_moves(match.get_current_player())
+
+    if depth == 1:
+        return sum(1 for _ in moves)
+
+    nodes = 0
+
+    for move in moves:
+        match.make(move)
+        nodes += perft(match, depth - 1)
+        match.unmake()
+
+    return nodes
+
+
+def perft_slow(match: GameMatch, depth: int) -> int:
+    if depth == 0:
+        return 1
+
+    board = match.get_board()
+
+    if board.check_end_condition():
+        return 0
+
+    player = match.get_current_player()
+    cells = board.get_cells()
+    nodes = 0
+
+    for cell in cells:
+        for ring_type in RingType:
+            if cell.has_ring(ring_type) or not player.get_ring_amount(ring_type):
+                continue
+
+            child = copy.deepcopy(match)
+            child.place_ring(ring_type, cell.get_pos(), child.get_current_player())
+            child.switch_turn()
+            nodes += perft_slow(child, depth - 1)
+
+    for origin in cells:
+        if origin.is_empty():
+            continue
+
+        for destination in cells:
+            if not origin.can_move_to(destination):
+                continue
+
+            child = copy.deepcopy(match)
+            child.move_cell_content(origin.get_pos(), destination.get_pos())
+            child.switch_turn()
+            nodes += perft_slow(child, depth - 1)
+
+    return nodes
+
+
+def divide(match: GameMatch, depth: int) -> list[tuple[str, int]]:
+    results = []
+
+    for move in match.legal_moves(match.get_current_player()):
+        match.make(move)
+        results.append((format_move(move), perft(match, depth - 1)))
+        match.unmake()
+
+    return results
+
+
+def format_move(move) -> str:
+    destination = bb.cell_index(move.get_destination_pos())
+
+    if move.get_origin_pos() is None:
+        return f"{move.get_ring_type().value}@{destination}"
+
+    return f"{bb.cell_index(move.get_origin_pos())}-{destination}"
+
+
+def run(bits: int, depth: int, slow: bool = False) -> tuple[int, float]:
+    match = create_match(bits)
+    start = time.perf_counter()
+    nodes = (perft_slow if slow else perft)(match, depth)
+    return nodes, time.perf_counter() - start
+
+
+def check_references(max_depth: int, slow: bool = False, log=print) -> bool:
+    ok = True
+
+    for name, counts in REFERENCE.items():
+        for depth, expected in sorted(counts.items()):
+            if depth > max_depth:
+                continue
+
+            nodes, elapsed = run(POSITIONS[name], depth, slow)
+            status = "ok" if nodes == expected else f"FAILED (expected {expected})"
+            ok = ok and nodes == expected
+
+            log(f"{name} depth {depth}: {nodes} nodes in {elapsed:.2f}s ({nodes / elapsed:.0f} nodes/s) {status}")
+
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conta as folhas da árvore de jogadas do Conjunto")
+    parser.add_argument("depth", type=int, nargs="?", default=3, help="profundidade")
+    parser.add_argument("--position", choices=sorted(POSITIONS), default="start")
+    parser.add_argument("--bits", type=lambda value: int(value, 0), help="tabuleiro em bits")
+    parser.add_argument("--slow", action="store_true", help="gera as jogadas pelas regras de Cell e Player")
+    parser.add_argument("--divide", action="store_true", help="mostra a contagem por jogada da raiz")
+    parser.add_argument("--check", action="store_true", help="confere as contagens de referência até a profundidade")
+    args = parser.parse_args()
+
+    if args.depth < 1:
+        parser.error("depth must be at least 1")
+
+    if args.check:
+        raise SystemExit(0 if check_references(args.depth, args.slow) else 1)
+
+    bits = args.bits if args.bits is not None else POSITIONS[args.position]
+
+    if args.divide:
+        for move, nodes in divide(create_match(bits), args.depth):
+            print(f"{move}: {nodes}")
+
+    nodes, elapsed = run(bits, args.depth, args.slow)
+    print(f"depth {args.depth}: {nodes} nodes in {elapsed:.2f}s ({nodes / elapsed:.0f} nodes/s)")
@@ -0,0 +1,261 @@
+import argparse
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+import symmetry
+from analysis import DRAW, LOSS, WIN, iter_archive_positions
+from game import MOVES, GameMatch, Movement, Player
+
+# Banco de posições em sqlite3, indexado pela chave canônica da posição
+# (symmetry.canonical_hash). Para cada posição guarda os resultados das
+# partidas do ponto de vista de quem joga, a soma dos comprimentos das
+# partidas e, por movimento (no referencial canônico), os mesmos resultados.
+
+# posições acumuladas na memória antes de cada escrita no banco
+DEFAULT_BATCH_SIZE = 50000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    hash INTEGER PRIMARY KEY,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    total_length INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS moves (
+    hash INTEGER NOT NULL,
+    move INTEGER NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    PRIMARY KEY (hash, move)
+) WITHOUT ROWID;
+"""
+
+UPSERT_POSITION = """
+INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (hash) DO UPDATE SET
+    games = games + excluded.games,
+    wins = wins + excluded.wins,
+    draws = draws + excluded.draws,
+    losses = losses + excluded.losses,
+    total_length = total_length + excluded.total_length
+"""
+
+UPSERT_MOVE = """
+INSERT INTO moves VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (hash, move) DO UPDATE SET
+    games = games + excluded.games,
+    wins = wins + excluded.wins,
+    draws = draws + excluded.draws,
+    losses = losses + excluded.losses
+"""
+
+# deslocamento da coluna de cada resultado a partir de `wins`
+OUTCOME_COLUMNS = {WIN: 0, DRAW: 1, LOSS: 2}
+
+
+def to_signed(key: int) -> int:
+    # o sqlite guarda inteiros de 64 bits com sinal
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+@dataclass
+class MoveSummary:
+    __move: Movement
+    __games: int
+    __wins: int
+    __draws: int
+    __losses: int
+
+    def get_move(self) -> Movement:
+        return self.__move
+
+    def get_games(self) -> int:
+        return self.__games
+
+    def get_wins(self) -> int:
+        return self.__wins
+
+    def get_draws(self) -> int:
+        return self.__draws
+
+    def get_losses(self) -> int:
+        return self.__losses
+
+
+@dataclass
+class PositionSummary:
+    # resultados do ponto de vista de quem joga na posição
+    __games: int
+    __wins: int
+    __draws: int
+    __losses: int
+    __average_length: float
+    __moves: list[MoveSummary]
+
+    def get_games(self) -> int:
+        return self.__games
+
+    def get_wins(self) -> int:
+        return self.__wins
+
+    def get_draws(self) -> int:
+        return self.__draws
+
+    def get_losses(self) -> int:
+        return self.__losses
+
+    def get_average_length(self) -> float:
+        return self.__average_length
+
+    def get_moves(self) -> list[MoveSummary]:
+        return self.__moves
+
+
+class PositionDatabase:
+    __connection: sqlite3.Connection
+
+    def __init__(self, path: str):
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        self.__connection.execute("PRAGMA synchronous = NORMAL")
+        self.__connection.executescript(SCHEMA)
+
+    def close(self):
+        self.__connection.close()
+
+    def ingest(self, paths: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE, log=None) -> int:
+        # soma as posições em dicionários e grava em lotes, cada um em uma
+        # transação
+        positions: dict[int, list[int]] = {}
+        moves: dict[tuple[int, int], list[int]] = {}
+        count = 0
+
+        for position in iter_archive_positions(paths, canonical=True):
+            key = to_signed(position.get_hash())
+            column = OUTCOME_COLUMNS[position.get_outcome()]
+
+            # mesma ordem das colunas de positions e moves
+            row = positions.get(key)
+            if row is None:
+                row = positions[key] = [key, 0, 0, 0, 0, 0]
+            row[1] += 1
+            row[2 + column] += 1
+            row[5] += position.get_length()
+
+            move_key = (key, position.get_move())
+            row = moves.get(move_key)
+            if row is None:
+                row = moves[move_key] = [key, position.get_move(), 0, 0, 0, 0]
+            row[2] += 1
+            row[3 + column] += 1
+
+            count += 1
+
+            if len(moves) >= batch_size:
+                self.__write(positions, moves)
+
+                if log:
+                    log(f"{count} positions")
+
+        self.__write(positions, moves)
+
+        return count
+
+    def __write(self, positions: dict[int, list[int]], moves: dict[tuple[int, int], list[int]]):
+        with self.__connection:
+            self.__connection.executemany(UPSERT_POSITION, positions.values())
+            self.__connection.executemany(UPSERT_MOVE, moves.values())
+
+        positions.clear()
+        moves.clear()
+
+    def get_position_count(self) -> int:
+        return self.__connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def lookup(self, match: GameMatch) -> PositionSummary | None:
+        key, transform = symmetry.canonical_hash(match)
+        key = to_signed(key)
+
+        row = self.__connection.execute(
+            "SELECT games, wins, draws, losses, total_length FROM positions WHERE hash = ?",
+            (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        games, wins, draws, losses, total_length = row
+        # os movimentos são guardados no referencial canônico
+        inverse = symmetry.inverse(transform)
+
+        moves = [
+            MoveSummary(MOVES[symmetry.transform_code(move, inverse)], *counts)
+            for move, *counts in self.__connection.execute(
+                "SELECT move, games, wins, draws, losses FROM moves "
+                "WHERE hash = ? ORDER BY games DESC",
+                (key,)
+            )
+        ]
+
+        return PositionSummary(games, wins, draws, losses, total_length / games, moves)
+
+
+def match_from_codes(codes: list[int]) -> GameMatch:
+    match = GameMatch(True, Player("query", "1"), Player("query", "2"))
+
+    for code in codes:
+        match.play_move(MOVES[code])
+        match.evaluate_round()
+
+    return match
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banco de posições do Conjunto")
+    parser.add_argument("database", help="arquivo sqlite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="adiciona arquivos de partidas ao banco")
+    ingest_parser.add_argument("archives", nargs="+")
+    ingest_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    query_parser = subparsers.add_parser("query", help="mostra o que aconteceu a partir de uma posição")
+    query_parser.add_argument("moves", nargs="?", default="", help="códigos dos movimentos desde o início, separados por vírgula")
+
+    args = parser.parse_args()
+    database = PositionDatabase(args.database)
+
+    if args.command == "ingest":
+        start = time.perf_counter()
+        count = database.ingest(args.archives, args.batch_size, print)
+        print(f"{count} positions ingested in {time.perf_counter() - start:.2f}s")
+    else:
+        codes = [int(code) for code in args.moves.split(",") if code]
+        start = time.perf_counter()
+        summary = database.lookup(match_from_codes(codes))
+        elapsed = time.perf_counter() - start
+
+        if summary is None:
+            print("position not found")
+        else:
+            print(
+                f"{summary.get_games()} games: +{summary.get_wins()} ={summary.get_draws()} "
+                f"-{summary.get_losses()}, average length {summary.get_average_length():.1f}"
+            )
+
+            for move_summary in summary.get_moves():
+                print(
+                    f"  {move_summary.get_move().get_code()}: {move_summary.get_games()} games, "
+                    f"+{move_summary.get_wins()} ={move_summary.get_draws()} -{move_summary.get_losses()}"
+                )
+
+        print(f"query took {elapsed * 1000:.1f}ms")
+
+    database.close()
@@ -0,0 +1,338 @@
+import argparse
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Iterator
+
+from game import MOVES, GameMatch, MatchSnapshot, Movement, Player, move_code_from_dict
+
+# Registro binário de partidas. Um arquivo de partidas tem um cabeçalho e uma
+# sequência de registros, cada um prefixado pelo seu tamanho para que quem lê
+# possa pular partidas sem decodificá-las:
+#
+#   tamanho (uint32) | cabeçalho do registro | nome e id dos dois jogadores |
+#   códigos dos movimentos (uint16) | keyframes
+#
+# Os movimentos são os códigos de game.MOVES, nos mesmos campos de
+# Movement.to_dict. A cada KEYFRAME_INTERVAL jogadas o registro guarda a
+# posição completa (tabuleiro e anéis restantes), para que um replay possa ir
+# direto para a jogada N sem refazer a partida desde o começo.
+
+MAGIC = b"CJGR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")
+SIZE = struct.Struct("<I")
+# quem começa, vencedor, número de movimentos, intervalo e número de keyframes
+RECORD_HEADER = struct.Struct("<BBHHH")
+# jogada, tabuleiro (48 bits) e anéis restantes dos jogadores local e remoto
+KEYFRAME = struct.Struct("<H6s6B")
+
+NO_WINNER = 0xFF
+KEYFRAME_INTERVAL = 16
+BOARD_BYTES = 6
+
+
+def create_match(players: tuple[tuple[str, str], tuple[str, str]], first: int) -> GameMatch:
+    (local_name, local_id), (remote_name, remote_id) = players
+
+    return GameMatch(first == 0, Player(local_name, local_id), Player(remote_name, remote_id))
+
+
+@dataclass
+class GameRecord:
+    # o jogador 0 é o local da partida gravada e o 1 é o remoto
+    __players: tuple[tuple[str, str], tuple[str, str]]
+    __first: int
+    __moves: array
+    __winner: int | None
+    __keyframe_interval: int
+    # (jogada, snapshot antes dela)
+    __keyframes: list[tuple[int, MatchSnapshot]]
+
+    @classmethod
+    def from_moves(
+        cls,
+        players: tuple[tuple[str, str], tuple[str, str]],
+        first: int,
+        codes: list[int] | array,
+        keyframe_interval: int = KEYFRAME_INTERVAL
+    ) -> "GameRecord":
+        # refaz a partida para calcular o vencedor e os keyframes
+        match = create_match(players, first)
+        keyframes = []
+        winner = None
+
+        for ply, code in enumerate(codes):
+            if winner is not None:
+                raise ValueError("Game record has moves after the end of the game")
+
+            if ply and ply % keyframe_interval == 0:
+                keyframes.append((ply, match.snapshot()))
+
+            match.play_move(MOVES[code])
+
+            if match.evaluate_round():
+                winner = 0 if match.get_local_turn() else 1
+
+        return GameRecord(players, first, array("H", codes), winner, keyframe_interval, keyframes)
+
+    def get_players(self) -> tuple[tuple[str, str], tuple[str, str]]:
+        return self.__players
+
+    def get_first(self) -> int:
+        return self.__first
+
+    def get_moves(self) -> array:
+        return self.__moves
+
+    def get_length(self) -> int:
+        return len(self.__moves)
+
+    def get_winner(self) -> int | None:
+        return self.__winner
+
+    def get_keyframe_interval(self) -> int:
+        return self.__keyframe_interval
+
+    def get_keyframes(self) -> list[tuple[int, MatchSnapshot]]:
+        return self.__keyframes
+
+    def get_move(self, ply: int) -> Movement:
+        return MOVES[self.__moves[ply]]
+
+    def create_match(self) -> GameMatch:
+        return create_match(self.__players, self.__first)
+
+    def position_at(self, ply: int) -> GameMatch:
+        # partida depois de `ply` jogadas, a partir do último keyframe
+        if not 0 <= ply <= len(self.__moves):
+            raise ValueError(f"Ply {ply} is outside the game (0..{len(self.__moves)})")
+
+        match = self.create_match()
+        start = 0
+
+        for keyframe_ply, snapshot in self.__keyframes:
+            if keyframe_ply > ply:
+                break
+            start = keyframe_ply
+            match.restore(snapshot)
+
+        for code in self.__moves[start:ply]:
+            match.play_move(MOVES[code])
+            match.evaluate_round()
+
+        return match
+
+
+class GameRecorder:
+    # Acumula os movimentos de uma partida em andamento, a partir dos mesmos
+    # dicionários trocados pela rede.
+    __players: tuple[tuple[str, str], tuple[str, str]]
+    __first: int
+    __moves: array
+
+    def __init__(self, match: GameMatch):
+        local = match.get_local_player()
+        remote = match.get_remote_player()
+
+        self.__players = (
+            (local.get_name(), local.get_id()),
+            (remote.get_name(), remote.get_id()),
+        )
+        self.__first = 0 if match.get_local_turn() else 1
+        self.__moves = array("H")
+
+    def add(self, move: Movement):
+        self.__moves.append(move.get_code())
+
+    def add_dict(self, move_dict: dict[str, Any]):
+        self.__moves.append(move_code_from_dict(move_dict))
+
+    def get_record(self, keyframe_interval: int = KEYFRAME_INTERVAL) -> GameRecord:
+        return GameRecord.from_moves(self.__players, self.__first, self.__moves, keyframe_interval)
+
+
+def encode_record(record: GameRecord) -> bytes:
+    winner = record.get_winner()
+    keyframes = record.get_keyframes()
+
+    parts = [
+        RECORD_HEADER.pack(
+            record.get_first(),
+            NO_WINNER if winner is None else winner,
+            record.get_length(),
+            record.get_keyframe_interval(),
+            len(keyframes),
+        )
+    ]
+
+    for player in record.get_players():
+        for text in player:
+            data = text.encode()
+            parts.append(bytes([len(data)]) + data)
+
+    moves = array("H", record.get_moves())
+
+    # o arquivo é sempre little-endian
+    if sys.byteorder == "big":
+        moves.byteswap()
+
+    parts.append(moves.tobytes())
+
+    for ply, snapshot in keyframes:
+        parts.append(KEYFRAME.pack(
+            ply,
+            snapshot.get_bits().to_bytes(BOARD_BYTES, "little"),
+            *snapshot.get_local_amounts(),
+            *snapshot.get_remote_amounts(),
+        ))
+
+    body = b"".join(parts)
+
+    return SIZE.pack(len(body)) + body
+
+
+def decode_record(data: bytes) -> GameRecord:
+    first, winner, num_moves, interval, num_keyframes = RECORD_HEADER.unpack_from(data, 0)
+    offset = RECORD_HEADER.size
+
+    texts = []
+
+    for _ in range(4):
+        length = data[offset]
+        texts.append(data[offset + 1:offset + 1 + length].decode())
+        offset += 1 + length
+
+    players = ((texts[0], texts[1]), (texts[2], texts[3]))
+
+    moves = array("H", data[offset:offset + 2 * num_moves])
+    offset += 2 * num_moves
+
+    if sys.byteorder == "big":
+        moves.byteswap()
+
+    keyframes = []
+
+    for _ in range(num_keyframes):
+        ply, board, *amounts = KEYFRAME.unpack_from(data, offset)
+        offset += KEYFRAME.size
+
+        # a vez é de quem começou nas jogadas pares
+        local_turn = (ply % 2 == 0) == (first == 0)
+
+        keyframes.append((ply, MatchSnapshot(
+            int.from_bytes(board, "little"),
+            local_turn,
+            tuple(amounts[:3]),
+            tuple(amounts[3:]),
+            players,
+        )))
+
+    return GameRecord(
+        players,
+        first,
+        moves,
+        None if winner == NO_WINNER else winner,
+        interval,
+        keyframes,
+    )
+
+
+def write_header(file: BinaryIO):
+    file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+
+def read_header(file: BinaryIO, path: str):
+    data = file.read(FILE_HEADER.size)
+
+    if len(data) < FILE_HEADER.size or FILE_HEADER.unpack(data) != (MAGIC, VERSION):
+        raise ValueError(f"'{path}' is not a Conjunto game archive")
+
+
+def append_record(path: str, record: GameRecord):
+    with open(path, "ab") as file:
+        if file.tell() == 0:
+            write_header(file)
+
+        file.write(encode_record(record))
+
+
+def write_records(path: str, records) -> int:
+    count = 0
+
+    with open(path, "wb") as file:
+        write_header(file)
+
+        for record in records:
+            file.write(encode_record(record))
+            count += 1
+
+    return count
+
+
+def iter_raw_records(path: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    # corpos dos registros um de cada vez. Com `start` e `end` (em bytes),
+    # devolve só os registros que começam nesse intervalo.
+    with open(path, "rb") as file:
+        read_header(file, path)
+
+        offset = file.tell()
+
+        while offset < start:
+            size = file.read(SIZE.size)
+            if len(size) < SIZE.size:
+                return
+            offset += SIZE.size + SIZE.unpack(size)[0]
+            file.seek(offset)
+
+        while end is None or offset < end:
+            size = file.read(SIZE.size)
+
+            if len(size) < SIZE.size:
+                return
+
+            length = SIZE.unpack(size)[0]
+            body = file.read(length)
+
+            # um registro incompleto no fim é de uma gravação interrompida
+            if len(body) < length:
+                return
+
+            offset += SIZE.size + length
+            yield body
+
+
+def read_records(path: str, start: int = 0, end: int | None = None) -> Iterator[GameRecord]:
+    return map(decode_record, iter_raw_records(path, start, end))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mostra partidas de um arquivo de partidas do Conjunto")
+    parser.add_argument("archive", help="arquivo de partidas")
+    parser.add_argument("--game", type=int, default=0, help="índice da partida no arquivo")
+    parser.add_argument("--ply", type=int, help="mostra o tabuleiro depois desta jogada (padrão: o fim)")
+    args = parser.parse_args()
+
+    for index, record in enumerate(read_records(args.archive)):
+        if index != args.game:
+            continue
+
+        (local_name, _), (remote_name, _) = record.get_players()
+        names = (local_name, remote_name)
+        winner = record.get_winner()
+
+        print(f"{names[0]} vs {names[1]}, {names[record.get_first()]} moves first")
+        print(f"{record.get_length()} moves, winner: {'none' if winner is None else names[winner]}")
+
+        ply = record.get_length() if args.ply is None else args.ply
+        try:
+            match = record.position_at(ply)
+        except ValueError as error:
+            parser.error(str(error))
+
+        print(f"board after move {ply}:")
+        print(match.get_board())
+        break
+    else:
+        parser.error(f"archive has no game {args.game}")
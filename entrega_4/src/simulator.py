@@ -0,0 +1,174 @@
+import argparse
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+import bitboard as bb
+from batch import check_end_conditions
+
+# Simula muitas partidas aleatórias em paralelo, todas na mesma jogada, com as
+# mesmas regras de GameMatch.place_ring, Board.move e Cell.can_move_to.
+#
+# Os movimentos são colunas internas do simulador, que não são os códigos de
+# game.MOVES: as colocações são célula * 3 + cor (0..47) e as realocações são
+# SIM_PLACEMENTS + origem * 16 + destino, com os pares sem caminho sempre
+# ilegais, para que as máscaras de todos os tabuleiros tenham a mesma forma.
+
+SIM_PLACEMENTS = bb.NUM_CELLS * bb.RING_BITS
+SIM_RELOCATIONS = bb.NUM_CELLS * bb.NUM_CELLS
+NUM_SIM_MOVES = SIM_PLACEMENTS + SIM_RELOCATIONS
+
+RELOCATION_ORIGINS = np.repeat(np.arange(bb.NUM_CELLS), bb.NUM_CELLS)
+RELOCATION_DESTINATIONS = np.tile(np.arange(bb.NUM_CELLS), bb.NUM_CELLS)
+
+# PATH_CELLS[pair, cell] indica se `cell` está no caminho do par (origem
+# exclusive, destino inclusive), a partir de bitboard.PATHS
+PATH_CELLS = np.array(
+    [
+        [bool(path & bb.CELL_MASKS[index]) for index in range(bb.NUM_CELLS)]
+        for path in bb.PATHS
+    ],
+    dtype=np.float32,
+)
+VALID_PAIRS = PATH_CELLS.any(axis=1)
+
+RING_BITS = np.array([1 << ring for ring in range(bb.RING_BITS)], dtype=np.uint8)
+
+
+@dataclass
+class SimulationResult:
+    __first_wins: int
+    __second_wins: int
+    __draws: int
+    __lengths: np.ndarray
+    __winners: np.ndarray
+    __elapsed: float
+
+    def get_games(self) -> int:
+        return len(self.__lengths)
+
+    def get_first_wins(self) -> int:
+        return self.__first_wins
+
+    def get_second_wins(self) -> int:
+        return self.__second_wins
+
+    def get_draws(self) -> int:
+        return self.__draws
+
+    def get_lengths(self) -> np.ndarray:
+        return self.__lengths
+
+    def get_winners(self) -> np.ndarray:
+        # 0 se quem começou venceu, 1 se o segundo venceu e -1 sem vencedor
+        return self.__winners
+
+    def get_elapsed(self) -> float:
+        return self.__elapsed
+
+    def get_first_player_advantage(self) -> float:
+        decided = self.__first_wins + self.__second_wins
+        if not decided:
+            return 0.0
+        return self.__first_wins / decided - 0.5
+
+    def __str__(self) -> str:
+        games = self.get_games()
+        lengths = self.__lengths
+
+        return "\n".join([
+            f"{games} games in {self.__elapsed:.2f}s ({games / self.__elapsed:.0f} games/s)",
+            f"first player wins: {self.__first_wins} ({self.__first_wins / games:.1%})",
+            f"second player wins: {self.__second_wins} ({self.__second_wins / games:.1%})",
+            f"draws (ply limit): {self.__draws} ({self.__draws / games:.1%})",
+            f"first player advantage: {self.get_first_player_advantage():+.2%}",
+            f"length: mean {lengths.mean():.1f}, median {np.median(lengths):.0f}, "
+            f"min {lengths.min()}, max {lengths.max()}",
+        ])
+
+
+def legal_move_mask(masks: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+    # (N, NUM_SIM_MOVES) com os movimentos legais de cada tabuleiro para o
+    # jogador com as quantidades `amounts` (N, 3)
+    has_ring = (masks[:, :, None] & RING_BITS) != 0
+    placements = ~has_ring & (amounts[:, None, :] > 0)
+
+    occupied = masks != 0
+    # em float para o produto usar BLAS
+    blocked = occupied.astype(np.float32) @ PATH_CELLS.T
+    relocations = VALID_PAIRS & occupied[:, RELOCATION_ORIGINS] & (blocked == 0)
+
+    return np.concatenate(
+        [placements.reshape(len(masks), SIM_PLACEMENTS), relocations], axis=1
+    )
+
+
+def simulate(games: int, max_plies: int = 200, seed: int | None = None) -> SimulationResult:
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+
+    masks = np.zeros((games, bb.NUM_CELLS), dtype=np.uint8)
+    amounts = np.full((games, 2, bb.RING_BITS), bb.MAX_RING_AMOUNT, dtype=np.int16)
+    winners = np.full(games, -1, dtype=np.int8)
+    lengths = np.full(games, max_plies, dtype=np.int32)
+    active = np.arange(games)
+
+    for ply in range(max_plies):
+        if not len(active):
+            break
+
+        side = ply % 2
+        legal = legal_move_mask(masks[active], amounts[active, side])
+
+        # sorteio uniforme entre os movimentos legais de cada partida
+        scores = rng.random(legal.shape, dtype=np.float32)
+        scores[~legal] = -1.0
+        moves = scores.argmax(axis=1)
+
+        stuck = ~legal.any(axis=1)
+
+        if stuck.any():
+            lengths[active[stuck]] = ply
+            active = active[~stuck]
+            moves = moves[~stuck]
+
+        placed = moves < SIM_PLACEMENTS
+
+        rows = active[placed]
+        cells, rings = np.divmod(moves[placed], bb.RING_BITS)
+        masks[rows, cells] |= RING_BITS[rings]
+        amounts[rows, side, rings] -= 1
+
+        rows = active[~placed]
+        pairs = moves[~placed] - SIM_PLACEMENTS
+        origins = RELOCATION_ORIGINS[pairs]
+        destinations = RELOCATION_DESTINATIONS[pairs]
+        masks[rows, destinations] = masks[rows, origins]
+        masks[rows, origins] = 0
+
+        won, _ = check_end_conditions(masks[active])
+
+        finished = active[won]
+        winners[finished] = side
+        lengths[finished] = ply + 1
+        active = active[~won]
+
+    return SimulationResult(
+        int((winners == 0).sum()),
+        int((winners == 1).sum()),
+        int((winners == -1).sum()),
+        lengths,
+        winners,
+        time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simula partidas aleatórias de Conjunto")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--max-plies", type=int, default=200)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    print(simulate(args.games, args.max_plies, args.seed))
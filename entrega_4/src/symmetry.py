@@ -0,0 +1,166 @@
+import bitboard as bb
+import zobrist
+from game import (
+    CODE_DESTINATIONS,
+    CODE_ORIGINS,
+    CODE_RINGS,
+    NUM_MOVE_CODES,
+    GameMatch,
+    MoveType,
+    Movement,
+    placement_code,
+    relocation_code,
+)
+
+_LAST = bb.NUM_ROWS - 1
+
+# as 8 simetrias do quadrado (grupo D4), como funções de (i, j)
+TRANSFORMS = (
+    lambda i, j: (i, j),
+    lambda i, j: (j, _LAST - i),
+    lambda i, j: (_LAST - i, _LAST - j),
+    lambda i, j: (_LAST - j, i),
+    lambda i, j: (i, _LAST - j),
+    lambda i, j: (_LAST - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (_LAST - j, _LAST - i),
+)
+IDENTITY = 0
+NUM_TRANSFORMS = len(TRANSFORMS)
+
+# CELL_MAPS[t][index] é o índice da célula para onde `index` vai em `t`
+CELL_MAPS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(bb.cell_index(transform(*bb.cell_pos(index))) for index in range(bb.NUM_CELLS))
+    for transform in TRANSFORMS
+)
+
+INVERSES: tuple[int, ...] = tuple(
+    next(
+        u for u in range(NUM_TRANSFORMS)
+        if all(CELL_MAPS[u][CELL_MAPS[t][index]] == index for index in range(bb.NUM_CELLS))
+    )
+    for t in range(NUM_TRANSFORMS)
+)
+
+# o tabuleiro é transformado em blocos de duas células (6 bits) por tabela
+CHUNK_CELLS = 2
+CHUNK_BITS = CHUNK_CELLS * bb.RING_BITS
+NUM_CHUNKS = bb.NUM_CELLS // CHUNK_CELLS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+def _build_chunk_tables() -> tuple[tuple[tuple[int, ...], ...], ...]:
+    tables = []
+
+    for cell_map in CELL_MAPS:
+        chunks = []
+
+        for chunk in range(NUM_CHUNKS):
+            values = []
+
+            for value in range(1 << CHUNK_BITS):
+                bits = 0
+
+                for k in range(CHUNK_CELLS):
+                    mask = (value >> (k * bb.RING_BITS)) & bb.CELL_MASK
+                    index = cell_map[chunk * CHUNK_CELLS + k]
+                    bits |= mask << (index * bb.RING_BITS)
+
+                values.append(bits)
+
+            chunks.append(tuple(values))
+
+        tables.append(tuple(chunks))
+
+    return tuple(tables)
+
+
+CHUNK_TABLES = _build_chunk_tables()
+
+
+def _map_code(cell_map: tuple[int, ...], code: int) -> int:
+    destination = cell_map[CODE_DESTINATIONS[code]]
+    ring_type = CODE_RINGS[code]
+
+    if ring_type is not None:
+        return placement_code(destination, ring_type)
+
+    return relocation_code(cell_map[CODE_ORIGINS[code]], destination)
+
+
+# CODE_MAPS[t][code] é o código do movimento `code` transformado por `t`
+CODE_MAPS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(_map_code(cell_map, code) for code in range(NUM_MOVE_CODES))
+    for cell_map in CELL_MAPS
+)
+
+
+def inverse(transform: int) -> int:
+    return INVERSES[transform]
+
+
+def transform_index(transform: int, index: int) -> int:
+    return CELL_MAPS[transform][index]
+
+
+def transform_pos(transform: int, pos: tuple[int, int]) -> tuple[int, int]:
+    return bb.POSITIONS[CELL_MAPS[transform][bb.cell_index(pos)]]
+
+
+def transform_bits(bits: int, transform: int) -> int:
+    chunks = CHUNK_TABLES[transform]
+    result = 0
+
+    for chunk in range(NUM_CHUNKS):
+        result |= chunks[chunk][(bits >> (chunk * CHUNK_BITS)) & CHUNK_MASK]
+
+    return result
+
+
+def canonicalize(bits: int) -> tuple[int, int]:
+    # devolve o menor tabuleiro entre as 8 simetrias e a transformação que
+    # leva `bits` até ele
+    best = bits
+    best_transform = IDENTITY
+
+    for transform in range(1, NUM_TRANSFORMS):
+        transformed = transform_bits(bits, transform)
+
+        if transformed < best:
+            best = transformed
+            best_transform = transform
+
+    return best, best_transform
+
+
+def canonical_hash(match: GameMatch) -> tuple[int, int]:
+    board = match.get_board()
+    canonical, transform = canonicalize(board.get_bits())
+
+    # a parte das quantidades de anéis não muda com a simetria
+    counts_key = match.get_hash() ^ board.get_hash()
+
+    return zobrist.board_hash(canonical) ^ counts_key, transform
+
+
+def transform_code(code: int, transform: int) -> int:
+    return CODE_MAPS[transform][code]
+
+
+def transform_move(move: Movement, transform: int) -> Movement:
+    destination = transform_pos(transform, move.get_destination_pos())
+
+    if move.get_move_type() == MoveType.PLACE_RING:
+        return Movement(
+            type=MoveType.PLACE_RING,
+            destination=destination,
+            ring_type=move.get_ring_type(),
+            match_status=move.get_match_status()
+        )
+
+    return Movement(
+        type=MoveType.MOVE_CELL_CONTENT,
+        destination=destination,
+        origin=transform_pos(transform, move.get_origin_pos()),
+        match_status=move.get_match_status()
+    )
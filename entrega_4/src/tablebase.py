@@ -0,0 +1,359 @@
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from typing import BinaryIO
+
+import bitboard as bb
+from game import GameMatch, Movement
+
+# Tabela de finais resolvida por análise retrógrada.
+#
+# Um jogador só fica sem anéis de uma cor depois de colocar 16 deles, e aí
+# todas as células já têm essa cor. Por isso as quantidades dos Players nunca
+# restringem os movimentos e o valor de uma posição depende só do tabuleiro
+# (do ponto de vista de quem joga). As posições são separadas pelo total de
+# anéis de cada cor que ainda restam aos dois jogadores, o que equivale a
+# quantos espaços de cada cor faltam no tabuleiro. Dentro de uma partição só
+# há realocações, e cada colocação leva a uma partição já resolvida.
+#
+# O arquivo guarda uma tabela hash de endereçamento aberto, indexada pelos
+# espaços vazios do tabuleiro: um array de chaves uint64 (0 é vazio, já que o
+# tabuleiro cheio é sempre final) seguido de um array de entradas uint16.
+
+MAGIC = b"CJTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+KEY = struct.Struct("<Q")
+ENTRY = struct.Struct("<H")
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+UNKNOWN = 0
+WIN = 1
+LOSS = 2
+DRAW = 3
+
+VALUE_SHIFT = 14
+DISTANCE_MASK = (1 << VALUE_SHIFT) - 1
+
+MISSING_COUNTS = tuple(mask.bit_count() for mask in range(bb.CELL_MASK + 1))
+
+# LINES_ENDING[index] são as linhas cuja última célula é `index`
+LINES_ENDING = tuple(
+    tuple(line_id for line_id, line in enumerate(bb.LINES) if max(line) == index)
+    for index in range(bb.NUM_CELLS)
+)
+
+
+def encode_entry(value: int, distance: int) -> int:
+    return value << VALUE_SHIFT | min(distance, DISTANCE_MASK)
+
+
+def decode_entry(entry: int) -> tuple[int, int]:
+    return entry >> VALUE_SHIFT, entry & DISTANCE_MASK
+
+
+def missing_slots(bits: int) -> int:
+    return bb.FULL_BOARD ^ bits
+
+
+def hash_slot(missing: int, capacity_bits: int) -> int:
+    return ((missing * HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - capacity_bits)
+
+
+def iter_children(bits: int):
+    # (bits do filho, se é uma colocação) para cada movimento possível
+    missing = missing_slots(bits)
+
+    while missing:
+        low = missing & -missing
+        yield bits | low, True
+        missing ^= low
+
+    for origin in range(bb.NUM_CELLS):
+        mask = (bits >> (origin * bb.RING_BITS)) & bb.CELL_MASK
+
+        if not mask:
+            continue
+
+        cleared = bits & ~bb.CELL_MASKS[origin]
+
+        for destination in bb.iter_cells(bb.reachable_from(bits, origin)):
+            yield cleared | mask << (destination * bb.RING_BITS), False
+
+
+def iter_positions(empty: int):
+    # percorre as células em ordem escolhendo as cores que faltam em cada
+    # uma. Toda linha sem vencedor tem ao menos um anel faltando, então cada
+    # fileira que ainda não tem um precisa de um dos espaços restantes.
+    def assign(index: int, bits: int, remaining: int, row_open: bool):
+        if index == bb.NUM_CELLS:
+            if not remaining:
+                yield bits
+            return
+
+        column = index % bb.NUM_COLS
+        rows_left = bb.NUM_ROWS - 1 - index // bb.NUM_COLS
+
+        for missing in range(bb.CELL_MASK + 1):
+            used = MISSING_COUNTS[missing]
+
+            if used > remaining:
+                continue
+
+            open_after = row_open and not missing
+
+            if column == bb.NUM_COLS - 1:
+                if open_after:
+                    continue
+                needed = rows_left
+                open_after = True
+            else:
+                needed = rows_left + open_after
+
+            if remaining - used < needed:
+                continue
+
+            child = bits | (bb.CELL_MASK ^ missing) << (index * bb.RING_BITS)
+
+            if any(bb.is_winning_line(child, line_id) for line_id in LINES_ENDING[index]):
+                continue
+
+            yield from assign(index + 1, child, remaining - used, open_after)
+
+    yield from assign(0, 0, empty, True)
+
+
+def partition_of(bits: int) -> tuple[int, int, int]:
+    # quantos espaços de cada cor faltam no tabuleiro
+    missing = missing_slots(bits)
+
+    return tuple(
+        (missing & (bb.CELL_LOW_BITS << ring)).bit_count()
+        for ring in range(bb.RING_BITS)
+    )
+
+
+def solve_partition(states: list[int], lower: dict[int, int]) -> list[int]:
+    local = {bits: i for i, bits in enumerate(states)}
+    size = len(states)
+
+    values = [UNKNOWN] * size
+    distances = [0] * size
+    outer: list[list[tuple[int, int]]] = [[] for _ in range(size)]
+    inner: list[list[int]] = [[] for _ in range(size)]
+
+    for i, bits in enumerate(states):
+        for child, placed in iter_children(bits):
+            if bb.find_winning_line(child, bits ^ child) is not None:
+                values[i] = WIN
+                distances[i] = 1
+                break
+
+            if placed:
+                outer[i].append(decode_entry(lower[child]))
+            else:
+                inner[i].append(local[child])
+
+    changed = True
+
+    while changed:
+        changed = False
+
+        for i in range(size):
+            if values[i] == WIN and distances[i] == 1:
+                continue
+
+            shortest_loss = None
+            longest_win = 0
+            all_win = True
+
+            children = outer[i] + [(values[j], distances[j]) for j in inner[i]]
+
+            for value, distance in children:
+                if value == LOSS:
+                    if shortest_loss is None or distance < shortest_loss:
+                        shortest_loss = distance
+                elif value == WIN:
+                    longest_win = max(longest_win, distance)
+                else:
+                    all_win = False
+
+            if shortest_loss is not None:
+                value, distance = WIN, shortest_loss + 1
+            elif all_win and children:
+                value, distance = LOSS, longest_win + 1
+            else:
+                continue
+
+            if values[i] != value or distances[i] != distance:
+                values[i] = value
+                distances[i] = distance
+                changed = True
+
+    return [
+        encode_entry(value or DRAW, distance)
+        for value, distance in zip(values, distances)
+    ]
+
+
+def generate(path: str, budget: int, log=print):
+    solved: dict[int, int] = {}
+    lower: dict[int, int] = {}
+
+    for empty in range(budget + 1):
+        current: dict[int, int] = {}
+        partitions: dict[tuple[int, int, int], list[int]] = {}
+
+        for bits in iter_positions(empty):
+            partitions.setdefault(partition_of(bits), []).append(bits)
+
+        for partition, states in sorted(partitions.items()):
+            start = time.perf_counter()
+            entries = solve_partition(states, lower)
+
+            current.update(zip(states, entries))
+
+            log(
+                f"missing {partition}: {len(states)} positions "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+
+        solved.update(current)
+        lower = current
+
+    write_table(path, budget, solved)
+
+
+def write_table(path: str, budget: int, solved: dict[int, int]):
+    capacity_bits = 1
+
+    while (1 << capacity_bits) < 2 * len(solved):
+        capacity_bits += 1
+
+    capacity = 1 << capacity_bits
+    keys = array("Q", bytes(8 * capacity))
+    entries = array("H", bytes(2 * capacity))
+
+    for bits, entry in solved.items():
+        missing = missing_slots(bits)
+        slot = hash_slot(missing, capacity_bits)
+
+        while keys[slot]:
+            slot = (slot + 1) & (capacity - 1)
+
+        keys[slot] = missing
+        entries[slot] = entry
+
+    # o arquivo é sempre little-endian
+    if sys.byteorder == "big":
+        keys.byteswap()
+        entries.byteswap()
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, budget, capacity_bits))
+        file.write(keys.tobytes())
+        file.write(entries.tobytes())
+
+
+class Tablebase:
+    __file: BinaryIO
+    __map: mmap.mmap
+    __budget: int
+    __capacity_bits: int
+    __entries_offset: int
+
+    def __init__(self, path: str):
+        self.__file = open(path, "rb")
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, budget, capacity_bits = HEADER.unpack_from(self.__map, 0)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' is not a Conjunto tablebase")
+
+        self.__budget = budget
+        self.__capacity_bits = capacity_bits
+        self.__entries_offset = HEADER.size + 8 * (1 << capacity_bits)
+
+    def get_budget(self) -> int:
+        return self.__budget
+
+    def close(self):
+        self.__map.close()
+        self.__file.close()
+
+    def probe_bits(self, bits: int) -> tuple[int, int] | None:
+        # (WIN | LOSS | DRAW, distância em jogadas) para quem joga, ou None
+        # se a posição está fora da tabela ou já tem uma linha fechada
+        missing = missing_slots(bits)
+
+        if not missing or missing.bit_count() > self.__budget:
+            return None
+
+        table = self.__map
+        mask = (1 << self.__capacity_bits) - 1
+        slot = hash_slot(missing, self.__capacity_bits)
+
+        while True:
+            key = KEY.unpack_from(table, HEADER.size + 8 * slot)[0]
+
+            if key == missing:
+                entry = ENTRY.unpack_from(table, self.__entries_offset + 2 * slot)[0]
+                return decode_entry(entry)
+
+            if not key:
+                return None
+
+            slot = (slot + 1) & mask
+
+    def probe(self, match: GameMatch) -> tuple[int, int] | None:
+        return self.probe_bits(match.get_board().get_bits())
+
+    def best_move(self, match: GameMatch) -> Movement | None:
+        if self.probe(match) is None:
+            return None
+
+        best_move = None
+        best_key = None
+
+        for move in match.legal_moves(match.get_current_player()):
+            match.make(move)
+
+            if match.get_board().winning_line() is not None:
+                match.unmake()
+                return move
+
+            entry = self.probe(match)
+            match.unmake()
+
+            if entry is None:
+                continue
+
+            value, distance = entry
+
+            # prefere derrotar o adversário rápido, depois empatar, e se
+            # perder, demorar o máximo possível
+            if value == LOSS:
+                key = (2, -distance)
+            elif value == DRAW:
+                key = (1, 0)
+            else:
+                key = (0, distance)
+
+            if best_key is None or key > best_key:
+                best_move = move
+                best_key = key
+
+        return best_move
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera a tabela de finais do Conjunto")
+    parser.add_argument("output", help="arquivo de saída")
+    parser.add_argument("--budget", type=int, default=5, help="máximo de espaços vazios no tabuleiro")
+    args = parser.parse_args()
+
+    generate(args.output, args.budget)
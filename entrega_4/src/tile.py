@@ -18,6 +18,7 @@ class Tile:
     __red_id: int | None
     __green_id: int | None
     __blue_id: int | None
+    __ring_set: frozenset[RingType] | None
 
     def __init__(
         self,
@@ -37,6 +38,7 @@ class Tile:
         self.__red_id = None
         self.__green_id = None
         self.__blue_id = None
+        self.__ring_set = None
 
         self.mount()
     
@@ -82,7 +84,14 @@ class Tile:
         if self.__on_click:
             self.__on_click(self)
     
-    def update_ring_set(self, ring_set: set[RingType]):
+    def update_ring_set(self, ring_set: set[RingType] | frozenset[RingType]):
+        # as células passam conjuntos compartilhados, então na maioria das
+        # vezes basta comparar com o último desenhado
+        if ring_set == self.__ring_set:
+            return
+
+        self.__ring_set = frozenset(ring_set)
+
         x, y = self.__canvas_pos
         x += c.BOARD_TILE_SIZE / 2
         y += c.BOARD_TILE_SIZE / 2
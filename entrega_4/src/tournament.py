@@ -0,0 +1,223 @@
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from typing import Any
+
+from dog import StartStatus
+from engines import ENGINES, create_engine
+from game import GameMatch
+
+# Torneio entre engines em todos os núcleos. Cada partida é uma tarefa
+# independente; os resultados são gravados em JSON lines à medida que chegam,
+# e uma execução interrompida continua de onde parou com o mesmo arquivo.
+
+DEFAULT_TIME = 0.1
+MAX_PLIES = 300
+# quantil da normal para o intervalo de confiança de 95%
+CONFIDENCE_Z = 1.96
+# maior diferença de Elo mostrada, equivalente a 99% dos pontos
+MAX_ELO = 800.0
+
+
+def parse_engine_spec(spec: str) -> tuple[str, float]:
+    # "alphabeta" ou "alphabeta:0.5", com o tempo por jogada em segundos
+    name, _, budget = spec.partition(":")
+
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}'")
+
+    return name, float(budget) if budget else DEFAULT_TIME
+
+
+def play_game(task: dict[str, Any]) -> dict[str, Any]:
+    # `engine` joga como jogador local e começa se `engine_first` for True,
+    # seguindo a mesma regra de GameMatch.evaluate_turn
+    engine_first = task["engine_first"]
+    local_order, remote_order = ("1", "2") if engine_first else ("2", "1")
+
+    status = StartStatus(
+        "2",
+        "",
+        [
+            [task["engine"], "1", local_order],
+            [task["opponent"], "2", remote_order],
+        ],
+        "1"
+    )
+    match = GameMatch.from_start_status(status)
+
+    engines = {
+        True: create_engine(*parse_engine_spec(task["engine"])),
+        False: create_engine(*parse_engine_spec(task["opponent"])),
+    }
+
+    winner = None
+    plies = 0
+
+    while plies < task["max_plies"]:
+        local_turn = match.get_local_turn()
+        move = engines[local_turn].choose_move(match)
+
+        if move is None:
+            break
+
+        match.play_move(move)
+        plies += 1
+
+        if match.evaluate_round():
+            winner = "engine" if local_turn else "opponent"
+            break
+
+    return {**task, "winner": winner, "plies": plies}
+
+
+def build_tasks(specs: list[str], games_per_pair: int, max_plies: int) -> list[dict[str, Any]]:
+    tasks = []
+
+    for engine, opponent in combinations(specs, 2):
+        for game in range(games_per_pair):
+            tasks.append({
+                "engine": engine,
+                "opponent": opponent,
+                "game": game,
+                # alterna quem começa a cada partida do par
+                "engine_first": game % 2 == 0,
+                "max_plies": max_plies,
+            })
+
+    return tasks
+
+
+def task_key(task: dict[str, Any]) -> tuple[str, str, int]:
+    return task["engine"], task["opponent"], task["game"]
+
+
+def load_results(path: str) -> list[dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+
+    results = []
+
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+
+            # uma linha incompleta no fim é de uma execução interrompida
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+
+    return results
+
+
+def elo_difference(wins: int, losses: int, draws: int) -> tuple[float, float, float]:
+    # diferença de Elo estimada e o intervalo de confiança de 95%. O
+    # intervalo de Wilson continua válido com 0% ou 100% de pontos, em que
+    # a variância observada é zero e o intervalo normal viraria um ponto.
+    games = wins + losses + draws
+
+    if not games:
+        return 0.0, -MAX_ELO, MAX_ELO
+
+    score = (wins + draws / 2) / games
+    z2 = CONFIDENCE_Z ** 2
+    center = (score + z2 / (2 * games)) / (1 + z2 / games)
+    margin = (
+        CONFIDENCE_Z / (1 + z2 / games)
+        * math.sqrt(score * (1 - score) / games + z2 / (4 * games ** 2))
+    )
+
+    return score_to_elo(score), score_to_elo(center - margin), score_to_elo(center + margin)
+
+
+def score_to_elo(score: float) -> float:
+    # limitado a ±MAX_ELO, já que 0% e 100% não têm diferença finita
+    if score <= 0:
+        return -MAX_ELO
+    if score >= 1:
+        return MAX_ELO
+    return max(-MAX_ELO, min(MAX_ELO, 400 * math.log10(score / (1 - score))))
+
+
+def summarize(results: list[dict[str, Any]]) -> str:
+    pairs: dict[tuple[str, str], list[int]] = {}
+
+    for result in results:
+        counts = pairs.setdefault((result["engine"], result["opponent"]), [0, 0, 0])
+
+        if result["winner"] == "engine":
+            counts[0] += 1
+        elif result["winner"] == "opponent":
+            counts[1] += 1
+        else:
+            counts[2] += 1
+
+    lines = []
+
+    for (engine, opponent), (wins, losses, draws) in sorted(pairs.items()):
+        elo, low, high = elo_difference(wins, losses, draws)
+
+        lines.append(
+            f"{engine} vs {opponent}: +{wins} -{losses} ={draws}, "
+            f"Elo {elo:+.0f} [{low:+.0f}, {high:+.0f}]"
+        )
+
+    return "\n".join(lines)
+
+
+def run_tournament(
+    specs: list[str],
+    games_per_pair: int,
+    output: str,
+    workers: int | None = None,
+    max_plies: int = MAX_PLIES,
+    log=print
+) -> list[dict[str, Any]]:
+    for spec in specs:
+        parse_engine_spec(spec)
+
+    results = load_results(output)
+    done = {task_key(result) for result in results}
+    pending = [
+        task for task in build_tasks(specs, games_per_pair, max_plies)
+        if task_key(task) not in done
+    ]
+
+    log(f"{len(results)} games already played, {len(pending)} to go")
+
+    with open(output, "a") as file, ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(play_game, task) for task in pending]
+
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+
+            file.write(json.dumps(result) + "\n")
+            file.flush()
+
+            log(
+                f"[{len(results)}] {result['engine']} vs {result['opponent']} "
+                f"#{result['game']}: {result['winner'] or 'draw'} in {result['plies']} plies"
+            )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Torneio entre engines do Conjunto")
+    parser.add_argument("engines", nargs="+", help="engines no formato nome[:segundos por jogada]")
+    parser.add_argument("--games", type=int, default=20, help="partidas por par de engines")
+    parser.add_argument("--output", default="tournament.jsonl", help="arquivo de resultados")
+    parser.add_argument("--workers", type=int, help="processos (padrão: todos os núcleos)")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES)
+    args = parser.parse_args()
+
+    if len(args.engines) < 2:
+        parser.error("at least two engines are needed")
+
+    results = run_tournament(args.engines, args.games, args.output, args.workers, args.max_plies)
+    print(summarize(results))
@@ -0,0 +1,141 @@
+from array import array
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# cada entrada ocupa uma chave e um dado de 64 bits
+ENTRY_BYTES = 16
+BUCKET_SIZE = 2
+
+# layout do dado: | score + SCORE_OFFSET | move (16) | depth (8) | flag (2) |
+# O movimento é o código de game.MOVES.
+FLAG_BITS = 2
+DEPTH_BITS = 8
+MOVE_BITS = 16
+DEPTH_SHIFT = FLAG_BITS
+MOVE_SHIFT = DEPTH_SHIFT + DEPTH_BITS
+SCORE_SHIFT = MOVE_SHIFT + MOVE_BITS
+SCORE_OFFSET = 1 << 24
+
+FLAG_MASK = (1 << FLAG_BITS) - 1
+DEPTH_MASK = (1 << DEPTH_BITS) - 1
+MOVE_MASK = (1 << MOVE_BITS) - 1
+NO_MOVE = MOVE_MASK
+
+
+class TranspositionTable:
+    # Cada bucket tem dois slots: o primeiro guarda a entrada de maior
+    # profundidade e o segundo é sempre substituído.
+    __keys: array
+    __data: array
+    __index_mask: int
+
+    __hits: int
+    __misses: int
+    __collisions: int
+    __stores: int
+
+    def __init__(self, size_mb: float = 16):
+        max_entries = int(size_mb * 1024 * 1024) // ENTRY_BYTES
+        buckets = 1
+
+        while buckets * 2 * BUCKET_SIZE <= max_entries:
+            buckets *= 2
+
+        self.__index_mask = buckets - 1
+        self.__keys = array("Q", bytes(8 * buckets * BUCKET_SIZE))
+        self.__data = array("Q", bytes(8 * buckets * BUCKET_SIZE))
+
+        self.reset_counters()
+
+    def get_size_bytes(self) -> int:
+        return len(self.__keys) * ENTRY_BYTES
+
+    def get_capacity(self) -> int:
+        return len(self.__keys)
+
+    def get_hits(self) -> int:
+        return self.__hits
+
+    def get_misses(self) -> int:
+        return self.__misses
+
+    def get_collisions(self) -> int:
+        return self.__collisions
+
+    def get_stores(self) -> int:
+        return self.__stores
+
+    def get_hit_rate(self) -> float:
+        probes = self.__hits + self.__misses
+        if not probes:
+            return 0.0
+        return self.__hits / probes
+
+    def reset_counters(self):
+        self.__hits = 0
+        self.__misses = 0
+        self.__collisions = 0
+        self.__stores = 0
+
+    def clear(self):
+        size = len(self.__keys)
+        self.__keys = array("Q", bytes(8 * size))
+        self.__data = array("Q", bytes(8 * size))
+        self.reset_counters()
+
+    def probe(self, key: int) -> tuple[int, int, int, int] | None:
+        # devolve (score, depth, flag, move), com move == NO_MOVE se não houver
+        slot = (key & self.__index_mask) * BUCKET_SIZE
+        keys = self.__keys
+
+        for i in range(slot, slot + BUCKET_SIZE):
+            if keys[i] == key:
+                data = self.__data[i]
+
+                if data:
+                    self.__hits += 1
+                    return (
+                        (data >> SCORE_SHIFT) - SCORE_OFFSET,
+                        (data >> DEPTH_SHIFT) & DEPTH_MASK,
+                        data & FLAG_MASK,
+                        (data >> MOVE_SHIFT) & MOVE_MASK,
+                    )
+
+        self.__misses += 1
+
+        if self.__data[slot] or self.__data[slot + 1]:
+            self.__collisions += 1
+
+        return None
+
+    def store(self, key: int, depth: int, score: int, flag: int, move: int = NO_MOVE):
+        slot = (key & self.__index_mask) * BUCKET_SIZE
+        keys = self.__keys
+        data = self.__data
+
+        depth = min(depth, DEPTH_MASK)
+        value = (
+            (score + SCORE_OFFSET) << SCORE_SHIFT
+            | (move & MOVE_MASK) << MOVE_SHIFT
+            | depth << DEPTH_SHIFT
+            | flag
+        )
+
+        self.__stores += 1
+
+        preferred = data[slot]
+        preferred_depth = (preferred >> DEPTH_SHIFT) & DEPTH_MASK
+
+        if keys[slot] == key or not preferred or depth >= preferred_depth:
+            if keys[slot] != key and preferred:
+                # a entrada antiga desce para o slot de substituição
+                keys[slot + 1] = keys[slot]
+                data[slot + 1] = preferred
+
+            keys[slot] = key
+            data[slot] = value
+        else:
+            keys[slot + 1] = key
+            data[slot + 1] = value
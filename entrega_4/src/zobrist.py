@@ -0,0 +1,70 @@
+from random import Random
+
+import bitboard as bb
+
+NUM_RING_TYPES = 3
+
+# semente fixa para que a chave de uma posição seja a mesma em toda execução
+_random = Random(0x436F6E6A)
+
+
+def _key() -> int:
+    return _random.getrandbits(64)
+
+
+# CELL_KEYS[index][mask]; a célula vazia não contribui para a chave
+CELL_KEYS: tuple[tuple[int, ...], ...] = tuple(
+    (0,) + tuple(_key() for _ in range(bb.CELL_MASK))
+    for _ in range(bb.NUM_CELLS)
+)
+
+# COUNT_KEYS[slot][ring_index][amount], onde o slot 0 é o jogador da vez e o
+# slot 1 o adversário. Como as regras são iguais para os dois jogadores, a
+# chave descreve a posição do ponto de vista de quem joga.
+COUNT_KEYS: tuple[tuple[tuple[int, ...], ...], ...] = tuple(
+    tuple(
+        tuple(_key() for _ in range(bb.MAX_RING_AMOUNT + 1))
+        for _ in range(NUM_RING_TYPES)
+    )
+    for _ in range(2)
+)
+
+
+def board_hash(bits: int) -> int:
+    return board_hash_delta(0, bits)
+
+
+def board_hash_delta(old_bits: int, new_bits: int) -> int:
+    changed = old_bits ^ new_bits
+    cells = (changed | changed >> 1 | changed >> 2) & bb.CELL_LOW_BITS
+    key = 0
+
+    while cells:
+        low = cells & -cells
+        shift = low.bit_length() - 1
+        index = shift // bb.RING_BITS
+
+        key ^= CELL_KEYS[index][(old_bits >> shift) & bb.CELL_MASK]
+        key ^= CELL_KEYS[index][(new_bits >> shift) & bb.CELL_MASK]
+
+        cells ^= low
+
+    return key
+
+
+def counts_hash(mover_amounts: tuple[int, ...], other_amounts: tuple[int, ...]) -> int:
+    key = 0
+
+    for slot, amounts in enumerate((mover_amounts, other_amounts)):
+        for ring_index, amount in enumerate(amounts):
+            key ^= COUNT_KEYS[slot][ring_index][amount]
+
+    return key
+
+
+def position_hash(
+    bits: int,
+    mover_amounts: tuple[int, ...],
+    other_amounts: tuple[int, ...]
+) -> int:
+    return board_hash(bits) ^ counts_hash(mover_amounts, other_amounts)